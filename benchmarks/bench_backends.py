@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_rules, generate_transactions
+from transactions_access import TransactionsAccess
+from columnar_transactions_access import ColumnarTransactionsAccess
+from sqlite_transactions_access import SqliteTransactionsAccess
+from classification_engine import ClassificationEngine
+from rule_access import RuleAccess
+
+ROWS = 200_000
+BACKENDS = [
+    ('csv', lambda tmp: TransactionsAccess(os.path.join(tmp, 'storage.csv'))),
+    ('sqlite', lambda tmp: SqliteTransactionsAccess(os.path.join(tmp, 'transactions.db'))),
+    ('columnar', lambda tmp: ColumnarTransactionsAccess(os.path.join(tmp, 'store'))),
+]
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def classify(transactions_access, classification_engine, start_date, end_date):
+    transactions = transactions_access.get_transactions(start_date, end_date)
+    classification_engine.classify_transactions(transactions)
+    transactions_access.save_transactions()
+
+def main() -> None:
+    with TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'transactions.csv')
+        rules_file = os.path.join(tmp, 'rules.csv')
+        generate_transactions(source, ROWS)
+        generate_rules(rules_file, 50)
+        classification_engine = ClassificationEngine(RuleAccess(rules_file))
+        print(f'{ROWS} rows')
+        print(f"{'backend':>10} {'import (s)':>11} {'open (s)':>9} {'classify week (ms)':>19} {'classify year (s)':>18} {'query week (ms)':>16} {'query year (ms)':>16}")
+        for name, open_store in BACKENDS:
+            store_dir = os.path.join(tmp, name)
+            os.makedirs(store_dir)
+            transactions_access = open_store(store_dir)
+            import_time = timed(transactions_access.import_transactions, source)
+            transactions_access.close()
+            start = time.perf_counter()
+            transactions_access = open_store(store_dir)
+            open_time = time.perf_counter() - start
+            classify_week = timed(classify, transactions_access, classification_engine, '2020-06-01', '2020-06-07')
+            classify_year = timed(classify, transactions_access, classification_engine, '2020-01-01', '2020-12-31')
+            query_week = timed(transactions_access.get_transactions, '2021-06-01', '2021-06-07')
+            query_year = timed(transactions_access.get_transactions, '2021-01-01', '2021-12-31')
+            transactions_access.close()
+            print(f'{name:>10} {import_time:>11.2f} {open_time:>9.3f} {classify_week * 1e3:>19.1f} {classify_year:>18.2f} {query_week * 1e3:>16.2f} {query_year * 1e3:>16.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import os
+import random
+import sys
+import timeit
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_rules
+from classification_engine import ClassificationEngine
+from rule_access import RuleAccess
+
+RULE_COUNTS = [10, 100, 1_000, 10_000]
+TRANSACTIONS = 2_000
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'rules':>8} {'sequential (us/txn)':>20} {'compiled (us/txn)':>18}")
+    with TemporaryDirectory() as tmp:
+        for count in RULE_COUNTS:
+            rules_file = os.path.join(tmp, f'rules_{count}.csv')
+            generate_rules(rules_file, count)
+            rule_access = RuleAccess(rules_file)
+            # Half the descriptions match a random rule, the rest match nothing
+            descriptions = [f'merchant{rng.randrange(count)}x pty ltd' if i % 2 else f'unknown shop {i}' for i in range(TRANSACTIONS)]
+            results = []
+            for compiled in (False, True):
+                engine = ClassificationEngine(rule_access, compiled=compiled)
+                transactions = [{'description': description} for description in descriptions]
+                results.append(timeit.timeit(lambda: engine.classify_transactions(transactions), number=1) / TRANSACTIONS)
+                results.append([txn['label'] for txn in transactions])
+            assert results[1] == results[3], 'compiled matcher disagrees with sequential rules'
+            print(f'{count:>8} {results[0] * 1e6:>20.1f} {results[2] * 1e6:>18.1f}')
+
+if __name__ == '__main__':
+    main()
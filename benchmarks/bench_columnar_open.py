@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+from datetime import timedelta
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_transactions
+from transactions_access import TransactionsAccess
+from columnar_transactions_access import ColumnarTransactionsAccess
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+def open_and_query(open_store, start_date, end_date):
+    start = time.perf_counter()
+    transactions_access = open_store()
+    opened = time.perf_counter()
+    transactions_access.get_transactions(start_date, end_date)
+    return opened - start, time.perf_counter() - opened
+
+def main() -> None:
+    print(f"{'rows':>10} {'csv open (ms)':>14} {'csv query (ms)':>15} {'columnar open (ms)':>19} {'columnar query (ms)':>20}")
+    with TemporaryDirectory() as tmp:
+        for rows in SIZES:
+            source = os.path.join(tmp, f'transactions_{rows}.csv')
+            storage_file = os.path.join(tmp, f'storage_{rows}.csv')
+            store_dir = os.path.join(tmp, f'store_{rows}')
+            generate_transactions(source, rows)
+            TransactionsAccess(storage_file).import_transactions(source)
+            ColumnarTransactionsAccess(store_dir).append_transactions(TransactionsAccess(storage_file).transactions)
+
+            # A one-week window in the middle of the store
+            transactions_access = ColumnarTransactionsAccess(store_dir)
+            middle = transactions_access.get_transactions('2000-01-01', '2100-01-01')[rows // 2]['date']
+            transactions_access.close()
+            start_date = middle.strftime('%Y-%m-%d')
+            end_date = (middle + timedelta(days=6)).strftime('%Y-%m-%d')
+            csv_times = open_and_query(lambda: TransactionsAccess(storage_file), start_date, end_date)
+            columnar_times = open_and_query(lambda: ColumnarTransactionsAccess(store_dir), start_date, end_date)
+            print(f'{rows:>10} {csv_times[0] * 1e3:>14.1f} {csv_times[1] * 1e3:>15.2f} {columnar_times[0] * 1e3:>19.2f} {columnar_times[1] * 1e3:>20.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import timeit
+from datetime import timedelta
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_transactions
+from transactions_access import TransactionsAccess
+
+SIZES = [10_000, 100_000, 1_000_000]
+REPEAT = 200
+
+def scan(transactions_access, start_date, end_date, label=None):
+    """The list comprehension get_transactions used before the date index."""
+    return [txn for txn in transactions_access.transactions if start_date <= txn['date'] < end_date and (not label or txn['label'] == label)]
+
+def relabel_time(transactions_access, start_date, end_date):
+    """Relabel every transaction in a range and time folding the changes into the label indexes."""
+    for i, txn in enumerate(transactions_access.get_transactions(start_date, end_date)):
+        txn.label = ('Food', 'Home', 'Transport')[i % 3]
+    start = time.perf_counter()
+    # The next query syncs the label indexes with the relabelled transactions
+    transactions_access.get_transactions(start_date, start_date)
+    return time.perf_counter() - start
+
+def main() -> None:
+    print(f"{'rows':>10} {'index (us)':>12} {'label (us)':>12} {'scan (us)':>12} {'relabel week (ms)':>18} {'relabel all (ms)':>17}")
+    with TemporaryDirectory() as tmp:
+        for rows in SIZES:
+            source = os.path.join(tmp, f'transactions_{rows}.csv')
+            generate_transactions(source, rows)
+            transactions_access = TransactionsAccess(os.path.join(tmp, f'storage_{rows}.csv'))
+            transactions_access.import_transactions(source)
+
+            # A one-week window in the middle of the store
+            middle = transactions_access.date_index.dates[rows // 2]
+            start_date = middle.strftime('%Y-%m-%d')
+            end_date = (middle + timedelta(days=6)).strftime('%Y-%m-%d')
+            indexed = timeit.timeit(lambda: transactions_access.get_transactions(start_date, end_date), number=REPEAT) / REPEAT
+            labelled = timeit.timeit(lambda: transactions_access.get_transactions(start_date, end_date, 'Unclassified'), number=REPEAT) / REPEAT
+            scanned = timeit.timeit(lambda: scan(transactions_access, middle, middle + timedelta(days=7) - timedelta(seconds=1)), number=3) / 3
+            # Relabelling should scale with the rows relabelled and the store, not their product
+            relabel_week = relabel_time(transactions_access, start_date, end_date)
+            relabel_all = relabel_time(transactions_access, '0001-01-01', '9999-12-31')
+            print(f'{rows:>10} {indexed * 1e6:>12.1f} {labelled * 1e6:>12.1f} {scanned * 1e6:>12.1f} {relabel_week * 1e3:>18.1f} {relabel_all * 1e3:>17.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import csv
+import os
+import sys
+import time
+from datetime import datetime
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_transactions
+from transaction import Transaction
+from transactions_access import TransactionsAccess, read_storage_file, read_transactions_file
+
+ROWS = 500_000
+
+def read_transactions_strptime(transactions_file):
+    """The per-row strptime parsing read_transactions_file did before DateParser."""
+    transactions = []
+    with open(transactions_file, mode='r', newline='') as file:
+        for row in csv.DictReader(file):
+            try:
+                date = datetime.strptime(row['date'], '%d/%m/%Y')
+            except ValueError:
+                raise ValueError(f"Date {row['date']} does not match any known formats")
+            transactions.append(Transaction(date, row['description'], float(row['amount'])))
+    return transactions
+
+def rate(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return ROWS / (time.perf_counter() - start)
+
+def main() -> None:
+    with TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'transactions.csv')
+        storage_file = os.path.join(tmp, 'storage.csv')
+        generate_transactions(source, ROWS)
+        print(f'{ROWS} rows, rows per second')
+        print(f"{'parse export (strptime)':>28} {rate(read_transactions_strptime, source):>10,.0f}")
+        print(f"{'parse export':>28} {rate(read_transactions_file, source):>10,.0f}")
+        print(f"{'import':>28} {rate(TransactionsAccess(storage_file).import_transactions, source):>10,.0f}")
+        print(f"{'parse storage':>28} {rate(list, read_storage_file(storage_file)):>10,.0f}")
+        print(f"{'load':>28} {rate(TransactionsAccess, storage_file):>10,.0f}")
+
+if __name__ == '__main__':
+    main()
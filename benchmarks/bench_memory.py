@@ -0,0 +1,54 @@
+import csv
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_transactions
+from transactions_access import TransactionsAccess, read_storage_file
+
+ROWS = 200_000
+
+def read_storage_dicts(storage_file):
+    """The csv.DictReader rows read_storage_file returned before Transaction records."""
+    with open(storage_file, mode='r', newline='') as file:
+        for row in csv.DictReader(file):
+            row['date'] = datetime.strptime(row['date'], '%Y-%m-%d')
+            row['amount'] = float(row['amount'])
+            row.setdefault('label', '')
+            row.setdefault('rule_version', '')
+            yield row
+
+def traced(function, *args):
+    """Run a function and return its result with the memory still allocated by it."""
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def main() -> None:
+    with TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'transactions.csv')
+        storage_file = os.path.join(tmp, 'storage.csv')
+        generate_transactions(source, ROWS)
+        TransactionsAccess(storage_file).import_transactions(source)
+
+        scale = 1_000_000 / ROWS
+        print(f'{ROWS} rows, MiB per million rows')
+        rows, size = traced(list, read_storage_dicts(storage_file))
+        print(f"{'dict rows':>22} {size * scale / 2**20:>8.1f}")
+        del rows
+        rows, size = traced(list, read_storage_file(storage_file))
+        print(f"{'Transaction rows':>22} {size * scale / 2**20:>8.1f}")
+        del rows
+        transactions_access, size = traced(TransactionsAccess, storage_file)
+        print(f"{'TransactionsAccess':>22} {size * scale / 2**20:>8.1f}")
+
+if __name__ == '__main__':
+    main()
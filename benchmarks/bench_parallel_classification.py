@@ -0,0 +1,40 @@
+import os
+import random
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_rules
+from classification_engine import ClassificationEngine
+from rule_access import RuleAccess
+
+TRANSACTIONS = 100_000
+RULES = 500
+
+def main() -> None:
+    rng = random.Random(0)
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    with TemporaryDirectory() as tmp:
+        rules_file = os.path.join(tmp, 'rules.csv')
+        generate_rules(rules_file, RULES)
+        rule_access = RuleAccess(rules_file)
+        # Distinct descriptions, so that no worker is helped by repeats
+        descriptions = [f'merchant{rng.randrange(RULES * 2)}x order {i}' for i in range(TRANSACTIONS)]
+        print(f'{os.cpu_count()} cores, {TRANSACTIONS} transactions, {RULES} rules')
+        print(f"{'workers':>8} {'seconds':>8} {'speedup':>8}")
+        baseline = expected = None
+        for workers in worker_counts:
+            transactions = [{'description': description} for description in descriptions]
+            engine = ClassificationEngine(rule_access, cache_size=0, workers=workers)
+            start = time.perf_counter()
+            engine.classify_transactions(transactions)
+            elapsed = time.perf_counter() - start
+            labels = [txn['label'] for txn in transactions]
+            if baseline is None:
+                baseline, expected = elapsed, labels
+            assert labels == expected, 'parallel labels differ from the serial run'
+            print(f'{workers:>8} {elapsed:>8.2f} {baseline / elapsed:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
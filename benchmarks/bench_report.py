@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+from array import array
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from report_access import ReportAccess
+from numpy_report_access import NumpyReportAccess
+
+SIZES = [1_000_000, 10_000_000]
+LABELS = ['Food', 'Clothing', 'Home', 'Utilities', 'Government', 'Transport', 'Unclassified']
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>10} {'dict loop (s)':>14} {'numpy (s)':>10} {'speedup':>8}")
+    for rows in SIZES:
+        codes = array('I', rng.integers(0, len(LABELS), rows, dtype=np.uint32).tobytes())
+        cents = array('q', rng.integers(100, 250_000, rows, dtype=np.int64).tobytes())
+        dict_time, dict_report = timed(ReportAccess().generate_report_columns, codes, cents, LABELS)
+        numpy_time, numpy_report = timed(NumpyReportAccess().generate_report_columns, codes, cents, LABELS)
+        assert dict_report.keys() == numpy_report.keys()
+        assert all(abs(dict_report[label] - numpy_report[label]) < 0.01 * rows for label in dict_report)
+        print(f'{rows:>10} {dict_time:>14.2f} {numpy_time:>10.3f} {dict_time / numpy_time:>7.0f}x')
+
+if __name__ == '__main__':
+    main()
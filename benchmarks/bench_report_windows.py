@@ -0,0 +1,27 @@
+import os
+import sys
+import timeit
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_transactions
+from transactions_access import TransactionsAccess
+from report_access import ReportAccess
+
+ROWS = 200_000
+WINDOWS = [('2020-06-01', '2020-06-01'), ('2020-06-01', '2020-06-30'), ('2020-01-01', '2020-12-31'), ('2015-01-01', '2024-12-31')]
+
+def main() -> None:
+    with TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'transactions.csv')
+        generate_transactions(source, ROWS)
+        transactions_access = TransactionsAccess(os.path.join(tmp, 'storage.csv'))
+        transactions_access.import_transactions(source)
+        print(f"{'window':>24} {'rollup (ms)':>12} {'raw rows (ms)':>14}")
+        for start_date, end_date in WINDOWS:
+            rollup = timeit.timeit(lambda: ReportAccess.generate_report_stream(transactions_access.iter_label_totals(start_date, end_date)), number=20) / 20
+            raw = timeit.timeit(lambda: ReportAccess.generate_report_stream(transactions_access.iter_label_amounts(start_date, end_date)), number=3) / 3
+            print(f'{start_date + " " + end_date:>24} {rollup * 1e3:>12.3f} {raw * 1e3:>14.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic import generate_rules, generate_transactions
+from transactions_access import TransactionsAccess, read_transactions_file
+from classification_engine import ClassificationEngine
+from report_access import ReportAccess
+from reporting_manager import ReportingManager
+from rule_access import RuleAccess
+
+QUICK_ROWS = [10_000, 100_000]
+QUICK_RULES = [10, 100, 1_000]
+FULL_ROWS = [10_000, 100_000, 1_000_000, 10_000_000]
+FULL_RULES = [10, 100, 1_000, 10_000]
+# Numbered merchants in the synthetic ledgers, so that the report cases see several labels
+MERCHANTS = 200
+# One-week queries timed together, as a single one takes microseconds
+QUERIES = 1_000
+# Transactions classified per rule set; matching costs the same per transaction whatever the ledger size
+CLASSIFY_ROWS = 10_000
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+def best_time(function, repeat: int) -> float:
+    """Run a function repeatedly and return its fastest wall time in seconds, with the garbage collector off as timeit does."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(times)
+
+def run_rules(tmp: str, rule_counts: list[int], seed: int, repeat: int) -> dict[str, float]:
+    """
+    Time matching transactions against each rule set, without the description cache.
+
+    Each ledger names as many merchants as there are rules, so that every rule can
+    match and the number of distinct descriptions grows with the rule set.
+
+    Returns:
+        Dict[str, float]: Seconds per case, keyed by stage and size.
+    """
+    results = {}
+    for rule_count in rule_counts:
+        rules_file = os.path.join(tmp, f'rules_{rule_count}.csv')
+        generate_rules(rules_file, rule_count, seed=seed)
+        rule_access = RuleAccess(rules_file)
+        source = os.path.join(tmp, f'classify_{rule_count}.csv')
+        generate_transactions(source, CLASSIFY_ROWS, seed=seed, merchants=rule_count)
+        transactions = read_transactions_file(source)
+        engine = ClassificationEngine(rule_access, cache_size=0)
+        results[f'classify_transactions/rows={CLASSIFY_ROWS}/rules={rule_count}'] = best_time(lambda: engine.classify_transactions(transactions), repeat)
+    return results
+
+def run_rows(tmp: str, rows: int, seed: int, repeat: int) -> dict[str, float]:
+    """
+    Time each stage of the pipeline on a synthetic ledger.
+
+    Returns:
+        Dict[str, float]: Seconds per case, keyed by stage and size.
+    """
+    source = os.path.join(tmp, f'transactions_{rows}.csv')
+    generate_transactions(source, rows, seed=seed, merchants=MERCHANTS)
+    results = {}
+
+    def import_once():
+        storage_file = os.path.join(tmp, f'storage_{rows}.csv')
+        if os.path.exists(storage_file):
+            os.remove(storage_file)
+        TransactionsAccess(storage_file).import_transactions(source)
+    results[f'import_transactions/rows={rows}'] = best_time(import_once, repeat)
+
+    storage_file = os.path.join(tmp, f'storage_{rows}.csv')
+    results[f'load_transactions/rows={rows}'] = best_time(lambda: TransactionsAccess(storage_file), repeat)
+    transactions_access = TransactionsAccess(storage_file)
+
+    # A one-week window in the middle of the store, repeated as queries are fast
+    middle = transactions_access.date_index.dates[rows // 2].strftime('%Y-%m-%d')
+    week_end = transactions_access.date_index.dates[min(rows - 1, rows // 2 + rows // 520)].strftime('%Y-%m-%d')
+    results[f'get_transactions/rows={rows}/queries={QUERIES}'] = best_time(lambda: [transactions_access.get_transactions(middle, week_end) for _ in range(QUERIES)], repeat)
+
+    # Label the ledger, untimed, so that the reports have labels to group by
+    rules_file = os.path.join(tmp, f'rules_{MERCHANTS}.csv')
+    generate_rules(rules_file, MERCHANTS, seed=seed)
+    ClassificationEngine(RuleAccess(rules_file)).classify_transactions(transactions_access.get_transactions('0001-01-01', '9999-12-31'))
+    transactions_access.save_transactions()
+
+    reporting_manager = ReportingManager(transactions_access, None, ReportAccess())
+    results[f'generate_report/rows={rows}'] = best_time(lambda: reporting_manager.summarise('0001-01-01', '9999-12-31'), repeat)
+    results[f'generate_report_list/rows={rows}'] = best_time(lambda: ReportAccess.generate_report(transactions_access.transactions), repeat)
+    return results
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float, min_delta: float) -> list[str]:
+    """
+    Print each case against the baseline and return the cases that slowed down.
+
+    A case has regressed if it is slower than the baseline by more than the
+    tolerance, and by more than min_delta seconds so that timer noise on the
+    fastest cases is not reported.
+    """
+    regressions = []
+    print(f"{'case':<52} {'baseline (ms)':>14} {'now (ms)':>10} {'change':>8}")
+    for case, seconds in results.items():
+        if case not in baseline:
+            print(f'{case:<52} {"-":>14} {seconds * 1e3:>10.2f}')
+            continue
+        change = seconds / baseline[case] - 1
+        flag = ''
+        if change > tolerance and seconds - baseline[case] > min_delta:
+            regressions.append(case)
+            flag = '  REGRESSION'
+        print(f'{case:<52} {baseline[case] * 1e3:>14.2f} {seconds * 1e3:>10.2f} {change:>+8.0%}{flag}')
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time the import, load, classify, query and report stages on synthetic ledgers.')
+    parser.add_argument('--rows', type=int, nargs='+', help=f'Ledger sizes. Defaults to {QUICK_ROWS}.')
+    parser.add_argument('--rules', type=int, nargs='+', help=f'Rule set sizes. Defaults to {QUICK_RULES}.')
+    parser.add_argument('--full', action='store_true', help=f'Run every size: {FULL_ROWS} rows and {FULL_RULES} rules.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data.')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the fastest is kept.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline JSON file to compare with.')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline instead of comparing.')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed slowdown against the baseline, as a fraction.')
+    parser.add_argument('--min-delta', type=float, default=0.005, help='Slowdowns of fewer seconds than this are never regressions.')
+    args = parser.parse_args()
+    rows = args.rows or (FULL_ROWS if args.full else QUICK_ROWS)
+    rule_counts = args.rules or (FULL_RULES if args.full else QUICK_RULES)
+
+    results = {}
+    with TemporaryDirectory() as tmp:
+        for row_count in rows:
+            results.update(run_rows(tmp, row_count, args.seed, args.repeat))
+        results.update(run_rules(tmp, rule_counts, args.seed, args.repeat))
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, mode='w') as file:
+            json.dump(report, file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, mode='w') as file:
+            json.dump(report, file, indent=2)
+        print(f'Saved {len(results)} cases to {args.baseline}')
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    if regressions:
+        print(f'{len(regressions)} cases are more than {args.tolerance:.0%} slower than the baseline', file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
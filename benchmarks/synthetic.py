@@ -0,0 +1,51 @@
+import csv
+import random
+from datetime import date, timedelta
+
+MERCHANTS = [
+    "Ted's coffee", "Moe's Shiny Shoes", 'Maccas', 'Rent', 'Power networks', 'Car repairs',
+    'Coles', 'Woolworths', 'IGA', 'City bistro', 'Water corp', 'Mobile plan', 'Internet',
+]
+
+def generate_transactions(transactions_file: str, rows: int, seed: int = 0, start: date = date(2015, 1, 1), days: int = 3650, merchants: int = 0) -> None:
+    """
+    Write a synthetic bank export in the import format (day/month/year dates, in date order).
+
+    Args:
+        transactions_file (str): Path of the CSV file to write.
+        rows (int): Number of transactions to generate.
+        seed (int): Seed for the random generator. Defaults to 0.
+        start (date): Date of the first transaction. Defaults to 2015-01-01.
+        days (int): Number of days the transactions are spread over. Defaults to 3650.
+        merchants (int): If set, half the descriptions name one of this many numbered
+            merchants, which the rules of generate_rules match. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    with open(transactions_file, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['date', 'description', 'amount'])
+        for i in range(rows):
+            day = start + timedelta(days=i * days // rows)
+            if merchants and rng.random() < 0.5:
+                description = f'MERCHANT{rng.randrange(merchants)}X PTY LTD'
+            else:
+                description = rng.choice(MERCHANTS)
+            writer.writerow([f'{day.day}/{day.month}/{day.year}', description, f'{rng.randint(100, 250000) / 100:.2f}'])
+
+LABELS = ['Food', 'Clothing', 'Home', 'Utilities', 'Government', 'Transport', 'Health', 'Travel']
+
+def generate_rules(rules_file: str, rules: int, seed: int = 0) -> None:
+    """
+    Write a synthetic rules file of literal merchant alternations.
+
+    Args:
+        rules_file (str): Path of the CSV file to write.
+        rules (int): Number of rules to generate.
+        seed (int): Seed for the random generator. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    with open(rules_file, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['pattern', 'label'])
+        for i in range(rules):
+            writer.writerow([f'merchant{i}x|store{i}x', rng.choice(LABELS)])
@@ -1,40 +1,190 @@
-import re
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from transaction import Transaction
+from rule_matcher import CompiledRuleMatcher
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Number of descriptions sent to a worker process at a time
+PARALLEL_CHUNK_SIZE = 10_000
+
+# Rules and matcher of a worker process, set once when the worker starts
+_worker_rules: list[dict[str, any]] = []
+_worker_matcher: Optional[CompiledRuleMatcher] = None
+
+def _init_worker(rules: list[dict[str, any]], compiled: bool) -> None:
+    """
+    Receive the rules in a new worker process and build its matcher.
+
+    Args:
+        rules (list): Classification rules, in priority order.
+        compiled (bool): Build a CompiledRuleMatcher from the rules.
+    """
+    global _worker_rules, _worker_matcher
+    _worker_rules = rules
+    _worker_matcher = CompiledRuleMatcher(rules) if compiled else None
+
+def _classify_chunk(descriptions: list[str]) -> list[str]:
+    """
+    Classify a chunk of descriptions in a worker process.
+
+    Args:
+        descriptions (list): Raw transaction descriptions.
+
+    Returns:
+        list: Label of each description, in the same order.
+    """
+    labels: dict[str, str] = {}
+    for description in descriptions:
+        description = description.lower()
+        if description not in labels:
+            labels[description] = ClassificationEngine._classify_description(description, _worker_rules, _worker_matcher)
+    return [labels[description.lower()] for description in descriptions]
 
 class ClassificationEngine:
-    def __init__(self, rule_access) -> None:
+    def __init__(self, rule_access, compiled: bool = False, cache_size: int = 4096, workers: int = 1) -> None:
         """
         Initialize the ClassificationEngine with a rule access object.
 
         Args:
             rule_access (RuleAccess): An object providing access to classification rules.
+            compiled (bool): Match all rules with a CompiledRuleMatcher in a single
+                pass instead of one search per rule. Defaults to False.
+            cache_size (int): Maximum number of descriptions whose label is memoised,
+                least recently used first out. 0 disables the cache. Defaults to 4096.
+            workers (int): Number of processes that classify_transactions splits the
+                transactions across. Defaults to 1, which classifies in this process.
         """
         self.rule_access = rule_access
+        self.compiled = compiled
+        self.cache_size = cache_size
+        self.workers = workers
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._fingerprint: Optional[str] = None
+        self._matcher: Optional[CompiledRuleMatcher] = None
 
-    def classify_transaction(self, transaction: dict[str, any]) -> str:
+    def cache_info(self) -> CacheInfo:
         """
-        Classify a single transaction based on classification rules.
+        Get statistics about the description cache.
+
+        Returns:
+            CacheInfo: Hits, misses, maximum size and current size of the cache.
+        """
+        return CacheInfo(self.cache_hits, self.cache_misses, self.cache_size, len(self._cache))
+
+    def _refresh(self) -> None:
+        """
+        Drop the cached labels and matcher if the rule set has changed since they were built.
+        """
+        fingerprint = self.rule_access.get_fingerprint()
+        if fingerprint != self._fingerprint:
+            self._cache.clear()
+            self._matcher = CompiledRuleMatcher(self.rule_access.get_rules()) if self.compiled else None
+            self._fingerprint = fingerprint
+
+    @staticmethod
+    def _classify_description(description: str, rules: list[dict[str, any]], matcher: Optional[CompiledRuleMatcher]) -> str:
+        """
+        Classify a lower-cased description, the first matching rule winning.
 
         Args:
-            transaction (dict): Transaction information.
+            description (str): Lower-cased transaction description.
+            rules (list): Classification rules, in priority order.
+            matcher (CompiledRuleMatcher, optional): Combined matcher built from the same rules.
 
         Returns:
-            str: Label for the classified transaction.
+            str: Label of the first matching rule, or 'Unclassified'.
         """
-        description = transaction['description'].lower()
-        for rule in self.rule_access.get_rules():
-            if re.search(rule['pattern'], description):
+        if matcher is not None:
+            label = matcher.match(description)
+            return 'Unclassified' if label is None else label
+        for rule in rules:
+            if rule['pattern'].search(description):
                 return rule['label']
         return 'Unclassified'
 
-    def classify_transactions(self, transactions: list[dict[str, any]]) -> None:
+    def _classify_cached(self, description: str, rules: list[dict[str, any]]) -> str:
+        """
+        Classify a description, reusing the label of an identical earlier description.
+
+        Args:
+            description (str): Raw transaction description.
+            rules (list): Classification rules, in priority order.
+
+        Returns:
+            str: Label for the description.
+        """
+        # Rules only ever see the lower-cased text, so that is the cache key
+        description = description.lower()
+        if not self.cache_size:
+            return self._classify_description(description, rules, self._matcher)
+        label = self._cache.get(description)
+        if label is not None:
+            self.cache_hits += 1
+            self._cache.move_to_end(description)
+            return label
+        self.cache_misses += 1
+        label = self._cache[description] = self._classify_description(description, rules, self._matcher)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return label
+
+    def classify_transaction(self, transaction: Transaction) -> str:
+        """
+        Classify a single transaction based on classification rules.
+
+        Args:
+            transaction (Transaction): Transaction information, or an equivalent dictionary.
+
+        Returns:
+            str: Label for the classified transaction.
+        """
+        self._refresh()
+        return self._classify_cached(transaction['description'], self.rule_access.get_rules())
+
+    def classify_transactions(self, transactions: list[Transaction]) -> None:
         """
         Classify a list of transactions based on classification rules.
 
         Args:
-            transactions (list): List of transaction dictionaries.
+            transactions (list): List of transactions, or equivalent dictionaries.
 
         Modifies:
-            Adds 'label' key to each transaction dictionary with the classification result.
+            Sets the 'label' of each transaction to the classification result, and its
+            'rule_version' to the fingerprint of the rules that produced it.
         """
+        self._refresh()
+        rules = self.rule_access.get_rules()
+        if self.workers > 1 and transactions:
+            for transaction, label in zip(transactions, self._classify_parallel([txn['description'] for txn in transactions], rules)):
+                transaction['label'] = label
+                transaction['rule_version'] = self._fingerprint
+            return
         for transaction in transactions:
-            transaction['label'] = self.classify_transaction(transaction)
+            transaction['label'] = self._classify_cached(transaction['description'], rules)
+            transaction['rule_version'] = self._fingerprint
+
+    def _classify_parallel(self, descriptions: list[str], rules: list[dict[str, any]]) -> list[str]:
+        """
+        Classify descriptions in chunks across a pool of worker processes.
+
+        The rules are sent to each worker once, when it starts. Each worker memoises
+        labels within a chunk only; the engine's own cache is not used.
+
+        Args:
+            descriptions (list): Raw transaction descriptions.
+            rules (list): Classification rules, in priority order.
+
+        Returns:
+            list: Label of each description, in the same order.
+        """
+        chunk_size = min(PARALLEL_CHUNK_SIZE, -(-len(descriptions) // self.workers))
+        chunks = [descriptions[i:i + chunk_size] for i in range(0, len(descriptions), chunk_size)]
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)), initializer=_init_worker, initargs=(rules, self.compiled)) as executor:
+            labels = []
+            for chunk_labels in executor.map(_classify_chunk, chunks):
+                labels.extend(chunk_labels)
+        return labels
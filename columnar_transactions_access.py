@@ -0,0 +1,443 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Iterator, Optional, Sequence
+from transaction import Transaction
+from transactions_access import ITransactionsAccess, import_checkpoint_name, read_transactions_file
+
+# Dates are stored as days since 1970-01-01
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+FORMAT_VERSION = 1
+
+class Column:
+    def __init__(self, path: str, typecode: str, writable: bool = False) -> None:
+        """
+        Initialize a fixed-width column stored in its own memory-mapped file.
+
+        Args:
+            path (str): Path of the column file.
+            typecode (str): array typecode of the values, e.g. 'i' or 'q'.
+            writable (bool): Map the file for in-place updates. Defaults to False.
+        """
+        self.path = path
+        self.typecode = typecode
+        self.writable = writable
+        self._file = None
+        self._mmap = None
+        self.values = memoryview(array(typecode))
+
+    def open(self) -> None:
+        """
+        Map the column file into memory. Pages are only read when values are accessed.
+        """
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            self._file = open(self.path, mode='r+b' if self.writable else 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ)
+            self.values = memoryview(self._mmap).cast(self.typecode)
+        else:
+            self.values = memoryview(array(self.typecode))
+
+    def close(self) -> None:
+        """
+        Unmap the column file.
+        """
+        self.values.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+        self.values = memoryview(array(self.typecode))
+
+    def append(self, values: array) -> None:
+        """
+        Append values to the end of the column file and remap it.
+
+        Args:
+            values (array): Values with the column's typecode.
+        """
+        self.close()
+        with open(self.path, mode='ab') as file:
+            file.write(values.tobytes())
+        self.open()
+
+    def truncate(self, count: int) -> None:
+        """
+        Drop values past a given count, left over from a write that was never committed.
+
+        The file is cut to size whether or not it is mapped, so a partly written
+        value at the end, which cannot be mapped, is dropped too.
+
+        Args:
+            count (int): Number of values to keep.
+        """
+        size = count * array(self.typecode).itemsize
+        if os.path.exists(self.path) and os.path.getsize(self.path) > size:
+            self.close()
+            os.truncate(self.path, size)
+            self.open()
+
+    def flush(self) -> None:
+        """
+        Write in-place updates back to the column file.
+        """
+        if self._mmap is not None:
+            self._mmap.flush()
+
+class ColumnarTransactionsAccess(ITransactionsAccess):
+    def __init__(self, store_dir: str = 'transactions_store') -> None:
+        """
+        Initialize ColumnarTransactionsAccess with a store directory.
+
+        Transactions are kept sorted by date in one binary file per column: dates as
+        int32 day numbers, amounts as int64 cents, and labels, rule versions and
+        descriptions as uint32 codes into dictionaries. Opening the store only maps
+        the files, so a date range query reads just the pages it touches.
+
+        Args:
+            store_dir (str): Path to the store directory. Defaults to 'transactions_store'.
+        """
+        self.store_dir = store_dir
+        self.dates = Column(os.path.join(store_dir, 'dates.i32'), 'i')
+        self.amounts = Column(os.path.join(store_dir, 'amounts.i64'), 'q')
+        self.labels = Column(os.path.join(store_dir, 'labels.u32'), 'I', writable=True)
+        self.rule_versions = Column(os.path.join(store_dir, 'rule_versions.u32'), 'I', writable=True)
+        self.descriptions = Column(os.path.join(store_dir, 'descriptions.u32'), 'I')
+        # Description dictionary: UTF-8 text and the offset of each entry in it
+        self.description_text = Column(os.path.join(store_dir, 'description_text.dat'), 'B')
+        self.description_offsets = Column(os.path.join(store_dir, 'description_offsets.i64'), 'q')
+        self.columns = [self.dates, self.amounts, self.labels, self.rule_versions, self.descriptions, self.description_text, self.description_offsets]
+        self.rows = 0
+        self.label_names: list[str] = []
+        self.rule_version_names: list[str] = []
+        self._description_codes: Optional[dict[str, int]] = None
+        # Transactions handed out by get_transactions, by row, for save_transactions
+        self._checked_out: dict[int, Transaction] = {}
+        if os.path.exists(os.path.join(self.store_dir, 'store.json')):
+            self.load_transactions()
+
+    def load_transactions(self) -> None:
+        """
+        Read the store metadata and map the column files.
+        """
+        with open(os.path.join(self.store_dir, 'store.json'), mode='r', encoding='utf-8') as file:
+            meta = json.load(file)
+        if meta['format'] != FORMAT_VERSION or meta['byteorder'] != sys.byteorder:
+            raise ValueError(f"Store {self.store_dir} has an unsupported format")
+        self.rows = meta['rows']
+        self.label_names = meta['labels']
+        self.rule_version_names = meta['rule_versions']
+        # An append killed part way leaves values past the committed counts
+        for column in self.columns[:5]:
+            column.truncate(self.rows)
+        descriptions = meta.get('descriptions')
+        if descriptions is None:
+            # Stores written before the count was recorded keep every whole offset
+            descriptions = os.path.getsize(self.description_offsets.path) // 8 - 1 if os.path.exists(self.description_offsets.path) else 0
+        self.description_offsets.truncate(descriptions + 1 if descriptions > 0 else 0)
+        for column in self.columns:
+            column.close()
+            column.open()
+        offsets = self.description_offsets.values
+        self.description_text.truncate(offsets[-1] if len(offsets) else 0)
+        if meta.get('merging'):
+            # A merge was committed but not all of its columns were moved into place
+            self._replace_merged_columns()
+            self._write_meta()
+
+    def _write_meta(self, merging: bool = False) -> None:
+        """
+        Atomically replace the store metadata, which commits appended rows.
+
+        Args:
+            merging (bool): Whether merged columns are waiting in temporary files
+                to replace the column files. Defaults to False.
+        """
+        meta = {
+            'format': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'rows': self.rows,
+            'labels': self.label_names,
+            'rule_versions': self.rule_version_names,
+            'descriptions': max(len(self.description_offsets.values) - 1, 0),
+        }
+        if merging:
+            meta['merging'] = True
+        tmp_file = os.path.join(self.store_dir, 'store.json.tmp')
+        with open(tmp_file, mode='w', encoding='utf-8') as file:
+            json.dump(meta, file)
+        os.replace(tmp_file, os.path.join(self.store_dir, 'store.json'))
+
+    @staticmethod
+    def _code(names: list[str], codes: dict[str, int], name: str) -> int:
+        """
+        Get the dictionary code of a string, adding it to the dictionary if needed.
+        """
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def _description(self, code: int) -> str:
+        """
+        Decode a description from the description dictionary.
+        """
+        offsets = self.description_offsets.values
+        return bytes(self.description_text.values[offsets[code]:offsets[code + 1]]).decode('utf-8')
+
+    def save_transactions(self) -> None:
+        """
+        Write label changes of the transactions handed out by get_transactions in place.
+        """
+        label_codes = {name: code for code, name in enumerate(self.label_names)}
+        rule_version_codes = {name: code for code, name in enumerate(self.rule_version_names)}
+        dictionary_size = len(self.label_names) + len(self.rule_version_names)
+        updates = [
+            (row, self._code(self.label_names, label_codes, transaction.label), self._code(self.rule_version_names, rule_version_codes, transaction.rule_version))
+            for row, transaction in self._checked_out.items()
+        ]
+        self._checked_out.clear()
+        # New labels must be in the dictionary before any row refers to them
+        if len(self.label_names) + len(self.rule_version_names) != dictionary_size:
+            self._write_meta()
+        labels, rule_versions = self.labels.values, self.rule_versions.values
+        for row, label_code, rule_version_code in updates:
+            if labels[row] != label_code:
+                labels[row] = label_code
+            if rule_versions[row] != rule_version_code:
+                rule_versions[row] = rule_version_code
+        del labels, rule_versions
+        self.labels.flush()
+        self.rule_versions.flush()
+
+    def append_transactions(self, transactions: list[Transaction]) -> None:
+        """
+        Add transactions to the store.
+
+        Rows dated on or after the last stored date are appended to the column files.
+        Otherwise the columns are merged and rewritten so that they stay sorted by date.
+
+        Args:
+            transactions (list): Parsed transactions to add.
+        """
+        if not transactions:
+            return
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.save_transactions()
+        if self._description_codes is None:
+            self._description_codes = {self._description(code): code for code in range(len(self.description_offsets.values) - 1)}
+        description_names = list(self._description_codes)
+        label_codes = {name: code for code, name in enumerate(self.label_names)}
+        rule_version_codes = {name: code for code, name in enumerate(self.rule_version_names)}
+        first_description = len(description_names)
+
+        transactions = sorted(transactions, key=lambda txn: txn.date)
+        new_columns = [
+            array('i', (txn.date.toordinal() - EPOCH_ORDINAL for txn in transactions)),
+            array('q', (round(txn.amount * 100) for txn in transactions)),
+            array('I', (self._code(self.label_names, label_codes, txn.label) for txn in transactions)),
+            array('I', (self._code(self.rule_version_names, rule_version_codes, txn.rule_version) for txn in transactions)),
+            array('I', (self._code(description_names, self._description_codes, txn.description) for txn in transactions)),
+        ]
+        text = array('B')
+        offsets = array('q', [0] if first_description == 0 else [])
+        end = self.description_offsets.values[-1] if first_description else 0
+        self.description_text.truncate(end)
+        for description in description_names[first_description:]:
+            encoded = description.encode('utf-8')
+            text.frombytes(encoded)
+            end += len(encoded)
+            offsets.append(end)
+        self.description_text.append(text)
+        self.description_offsets.append(offsets)
+
+        row_columns = self.columns[:5]
+        if self.rows and new_columns[0][0] < self.dates.values[self.rows - 1]:
+            # Merge: read the stored rows and rewrite every column in date order
+            merged = []
+            for column, values in zip(row_columns, new_columns):
+                stored = array(column.typecode, column.values[:self.rows].tobytes())
+                stored.extend(values)
+                merged.append(stored)
+            order = sorted(range(len(merged[0])), key=merged[0].__getitem__)
+            # The stored columns stay untouched until the metadata commits the merge,
+            # so a crash leaves either the old rows or the merged ones, never a mix
+            for column, values in zip(row_columns, merged):
+                with open(column.path + '.tmp', mode='wb') as file:
+                    file.write(array(column.typecode, (values[i] for i in order)).tobytes())
+            self.rows += len(transactions)
+            self._write_meta(merging=True)
+            self._replace_merged_columns()
+        else:
+            for column, values in zip(row_columns, new_columns):
+                column.truncate(self.rows)
+                column.append(values)
+            self.rows += len(transactions)
+        self._write_meta()
+
+    def _replace_merged_columns(self) -> None:
+        """
+        Move the merged columns written by append_transactions over the column files.
+        """
+        for column in self.columns[:5]:
+            if os.path.exists(column.path + '.tmp'):
+                column.close()
+                os.replace(column.path + '.tmp', column.path)
+                column.open()
+
+    def count_transactions(self) -> int:
+        return self.rows
+
+    def duplicate_index_file(self) -> Optional[str]:
+        return os.path.join(self.store_dir, 'hashes.u64')
+
+    def import_checkpoint_file(self, transactions_file: str) -> Optional[str]:
+        return os.path.join(self.store_dir, import_checkpoint_name(transactions_file))
+
+    def import_transactions(self, transactions_file: str) -> int:
+        """
+        Import transactions from a CSV file and save them to storage.
+
+        Args:
+            transactions_file (str): Path to the CSV file containing transactions.
+
+        Returns:
+            int: Number of transactions imported.
+        """
+        new_transactions = read_transactions_file(transactions_file)
+        self.append_transactions(new_transactions)
+        return len(new_transactions)
+
+    def _bounds(self, start_date: str, end_date: str) -> tuple[int, int]:
+        """
+        Locate the rows dated within an inclusive range of dates.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Returns:
+            Tuple[int, int]: First row and the row past the last one.
+        """
+        start_day = datetime.strptime(start_date, '%Y-%m-%d').toordinal() - EPOCH_ORDINAL
+        end_day = datetime.strptime(end_date, '%Y-%m-%d').toordinal() - EPOCH_ORDINAL
+        days = self.dates.values[:self.rows]
+        lo = bisect_left(days, start_day)
+        return lo, bisect_right(days, end_day, lo)
+
+    def _iter_rows(self, start_date: str, end_date: str, label: Optional[str]) -> Iterator[tuple[int, Transaction]]:
+        """
+        Yield the row number and a Transaction for each row within a date range and optional label.
+        """
+        lo, hi = self._bounds(start_date, end_date)
+        days = self.dates.values
+
+        label_code = None
+        if label:
+            if label not in self.label_names:
+                return
+            label_code = self.label_names.index(label)
+
+        amounts, labels, rule_versions, descriptions = self.amounts.values, self.labels.values, self.rule_versions.values, self.descriptions.values
+        dates: dict[int, datetime] = {}
+        description_names: dict[int, str] = {}
+        for row in range(lo, hi):
+            if label_code is not None and labels[row] != label_code:
+                continue
+            day = days[row]
+            if day not in dates:
+                dates[day] = datetime.fromordinal(day + EPOCH_ORDINAL)
+            code = descriptions[row]
+            if code not in description_names:
+                description_names[code] = self._description(code)
+            yield row, Transaction(dates[day], description_names[code], amounts[row] / 100, self.label_names[labels[row]], self.rule_version_names[rule_versions[row]])
+
+    def get_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> list[Transaction]:
+        """
+        Get transactions within a specified date range and optionally filtered by label.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+            label (str, optional): Filter transactions by label. Defaults to None.
+
+        Returns:
+            List[Transaction]: List of filtered transactions, in date order.
+        """
+        transactions = []
+        for row, transaction in self._iter_rows(start_date, end_date, label):
+            self._checked_out[row] = transaction
+            transactions.append(transaction)
+        return transactions
+
+    def iter_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> Iterator[Transaction]:
+        for _, transaction in self._iter_rows(start_date, end_date, label):
+            yield transaction
+
+    def iter_label_amounts(self, start_date: str, end_date: str) -> Iterator[tuple[str, float]]:
+        """
+        Yield the label and amount of each transaction within a date range.
+
+        Only the label and amount columns of the rows in range are read.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[str, float]: Label and amount of a transaction, in date order.
+        """
+        lo, hi = self._bounds(start_date, end_date)
+        label_names, labels, amounts = self.label_names, self.labels.values, self.amounts.values
+        for row in range(lo, hi):
+            yield label_names[labels[row]], amounts[row] / 100
+
+    def iter_dated_label_totals(self, start_date: str, end_date: str) -> Iterator[tuple[datetime, str, float]]:
+        """
+        Yield the date, label and amount of each transaction within a date range.
+
+        Only the date, label and amount columns of the rows in range are read, and
+        each day is converted to a datetime once.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[datetime, str, float]: Date, label and amount of a transaction, in date order.
+        """
+        lo, hi = self._bounds(start_date, end_date)
+        label_names, days, labels, amounts = self.label_names, self.dates.values, self.labels.values, self.amounts.values
+        day = day_date = None
+        for row in range(lo, hi):
+            if days[row] != day:
+                day = days[row]
+                day_date = datetime.fromordinal(day + EPOCH_ORDINAL)
+            yield day_date, label_names[labels[row]], amounts[row] / 100
+
+    def get_label_amount_columns(self, start_date: str, end_date: str) -> tuple[Sequence[int], Sequence[int], list[str]]:
+        """
+        Get the labels and amounts of the transactions within a date range as columns.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Returns:
+            Tuple: Label code of each transaction, its amount in cents, and the label of
+            each code. The columns are views of the mapped files, not copies.
+        """
+        lo, hi = self._bounds(start_date, end_date)
+        return self.labels.values[lo:hi], self.amounts.values[lo:hi], self.label_names
+
+    def close(self) -> None:
+        """
+        Save pending label changes and unmap the column files.
+        """
+        self.save_transactions()
+        for column in self.columns:
+            column.close()
@@ -1,59 +1,180 @@
 import click
+import timings
 from datetime import datetime
-from transactions_access import TransactionsAccess
+from transactions_access import ITransactionsAccess, StreamingTransactionsAccess, TransactionsAccess
+from columnar_transactions_access import ColumnarTransactionsAccess
+from sqlite_transactions_access import SqliteTransactionsAccess
 from classification_engine import ClassificationEngine
-from report_access import ReportAccess
+from report_access import PERIOD_GROUPINGS, ReportAccess
 from reporting_manager import ReportingManager
 from rule_access import RuleAccess
+from transaction_output import OUTPUT_FORMATS, create_output
 
 DATE_FORMAT='%Y-%m-%d'
 
 arg_start_date = click.argument('start_date', type=click.DateTime(formats=[DATE_FORMAT]), metavar='START_DATE')
 arg_end_date = click.argument('end_date', type=click.DateTime(formats=[DATE_FORMAT]), metavar='END_DATE', default=datetime.now().strftime(DATE_FORMAT))
+opt_format = click.option('--format', 'output_format', type=click.Choice(list(OUTPUT_FORMATS)), default='table', show_default=True, help='Output format of the transactions. With csv and jsonl, counts are printed to stderr.')
+
+def open_transactions_access(store: str) -> ITransactionsAccess:
+    """Opens the store at a path: a CSV file, a SQLite database, or otherwise a columnar store directory."""
+    with timings.stage('open store'):
+        if store.endswith('.csv'):
+            return TransactionsAccess(store)
+        if store.endswith(('.db', '.sqlite', '.sqlite3')):
+            return SqliteTransactionsAccess(store)
+        return ColumnarTransactionsAccess(store)
+
+def load_rules(rules_file: str) -> RuleAccess:
+    """Loads the classification rules from a CSV file."""
+    with timings.stage('load rules'):
+        return RuleAccess(rules_file)
+
+def emit_timings(timings_file: str, print_timings: bool) -> None:
+    """Stops recording the stages of the command and writes them out as JSON."""
+    record = timings.stop_timings()
+    if record is None:
+        return
+    line = record.to_json()
+    if print_timings:
+        click.echo(line, err=True)
+    if timings_file:
+        with open(timings_file, mode='a') as file:
+            file.write(line + '\n')
 
 @click.group()
-def cli():
-    pass
+@click.option('--store', default='transactions_storage.csv', show_default=True, help='Transactions store: a CSV file, a SQLite database (.db, .sqlite), or a directory for the columnar binary store.')
+@click.option('--timings', 'print_timings', is_flag=True, help='Print the wall time, rows and peak memory of each stage of the command to stderr as JSON.')
+@click.option('--timings-file', type=click.Path(dir_okay=False), help='Append the timings of the command to this file as a JSON line.')
+@click.option('--profile', 'profile_file', type=click.Path(dir_okay=False), help='Profile the command with cProfile and write the statistics to this file.')
+@click.pass_context
+def cli(ctx, store, print_timings, timings_file, profile_file):
+    ctx.obj = {'store': store}
+    if print_timings or timings_file:
+        timings.start_timings(ctx.invoked_subcommand)
+        ctx.call_on_close(lambda: emit_timings(timings_file, print_timings))
+    if profile_file:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump_profile():
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+        ctx.call_on_close(dump_profile)
 
 @cli.command(name='import')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=100_000, show_default=True, help='Number of transactions parsed and stored at a time.')
+@click.option('--resume', is_flag=True, help='Continue an import of the same file that stopped part way.')
+@click.option('--keep-duplicates', is_flag=True, help='Store transactions that are already in the store again.')
 @click.argument('transactions_file', type=click.Path(exists=True, dir_okay=False))
-def transactions_import_command(transactions_file):
+@click.pass_obj
+def transactions_import_command(obj, chunk_size, resume, keep_duplicates, transactions_file):
     """Imports the transactions from a file."""
-    transactions_access = TransactionsAccess()
+    transactions_access = open_transactions_access(obj['store'])
     reporting_manager = ReportingManager(transactions_access, None, None)
-    reporting_manager.import_transactions(transactions_file)
+    try:
+        reporting_manager.import_transactions(transactions_file, chunk_size, resume, not keep_duplicates)
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    finally:
+        transactions_access.close()
 
 @cli.command(name='classify')
 @click.option('--rules', type=click.Path(exists=True, dir_okay=False), help='CSV file containing the classification rules')
+@click.option('--compiled', is_flag=True, help='Match all rules in a single pass over each description.')
+@click.option('--cache-size', type=click.IntRange(min=0), default=4096, show_default=True, help='Number of distinct descriptions whose label is cached. 0 disables the cache.')
+@click.option('--incremental', is_flag=True, help='Only classify transactions that are unclassified or were labelled by a different rule set.')
+@click.option('--workers', type=click.IntRange(min=1), default=1, show_default=True, help='Number of processes to classify the transactions with.')
+@opt_format
+@click.option('--quiet', is_flag=True, help='Only print the number of transactions processed, not each transaction.')
 @arg_start_date
 @arg_end_date
-def classify_command(rules, start_date, end_date):
+@click.pass_obj
+def classify_command(obj, rules, compiled, cache_size, incremental, workers, output_format, quiet, start_date, end_date):
     """Classifies each transaction in a time period."""
-    transactions_access = TransactionsAccess()
-    rule_access = RuleAccess(rules)
-    classification_engine = ClassificationEngine(rule_access)
+    transactions_access = open_transactions_access(obj['store'])
+    rule_access = load_rules(rules)
+    classification_engine = ClassificationEngine(rule_access, compiled=compiled, cache_size=cache_size, workers=workers)
     reporting_manager = ReportingManager(transactions_access, classification_engine, None)
-    reporting_manager.classify_transactions(start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT))
+    output = create_output(output_format, classified=True)
+    reporting_manager.classify_transactions(start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT), incremental, output, quiet)
 
 @cli.command(name='list')
 @click.option('--label', help=("Output transactions corresponding to this label only. If not set, all transactions are shown."))
+@opt_format
 @arg_start_date
 @arg_end_date
-def list_command(label, start_date, end_date):
+@click.pass_obj
+def list_command(obj, label, output_format, start_date, end_date):
     """Lists transactions corresponding to a given label in a time period."""
-    transactions_access = TransactionsAccess()
+    transactions_access = open_transactions_access(obj['store'])
     reporting_manager = ReportingManager(transactions_access, None, None)
-    reporting_manager.list_transactions(start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT), label)
+    reporting_manager.list_transactions(start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT), label, create_output(output_format))
 
 @cli.command(name='report')
+@click.option('--stream', is_flag=True, help='Read a CSV store row by row instead of loading it into memory.')
+@click.option('--engine', type=click.Choice(['dict', 'numpy']), default='dict', show_default=True, help='Report engine: a per-transaction loop, or grouped NumPy reductions over columns.')
+@click.option('--group-by', type=click.Choice(PERIOD_GROUPINGS), help='Report each day, week, month or year of the period separately, in a single pass over the store.')
 @arg_start_date
 @arg_end_date
-def report_command(start_date, end_date):
+@click.pass_obj
+def report_command(obj, stream, engine, group_by, start_date, end_date):
     """Summarises expenditure in a period of time."""
-    transactions_access = TransactionsAccess()
-    report_access = ReportAccess()
+    if stream and obj['store'].endswith('.csv'):
+        transactions_access = StreamingTransactionsAccess(obj['store'])
+    else:
+        transactions_access = open_transactions_access(obj['store'])
+    if engine == 'numpy':
+        # NumPy is optional, so only import it when asked for
+        from numpy_report_access import NumpyReportAccess
+        report_access = NumpyReportAccess()
+    else:
+        report_access = ReportAccess()
     reporting_manager = ReportingManager(transactions_access, None, report_access)
-    reporting_manager.generate_report(start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT))
+    reporting_manager.generate_report(start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT), group_by)
+
+@cli.command(name='serve')
+@click.option('--rules', type=click.Path(exists=True, dir_okay=False), help='CSV file containing the classification rules. Without it, classify requests are refused.')
+@click.option('--compiled', is_flag=True, help='Match all rules in a single pass over each description.')
+@click.option('--engine', type=click.Choice(['dict', 'numpy']), default='dict', show_default=True, help='Report engine: a per-transaction loop, or grouped NumPy reductions over columns.')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Host to listen on.')
+@click.option('--port', type=click.IntRange(min=0, max=65535), default=8765, show_default=True, help='Port to listen on.')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), help='Listen on a Unix socket at this path instead of a port.')
+@click.pass_obj
+def serve_command(obj, rules, compiled, engine, host, port, socket_path):
+    """Keeps the store and rules loaded and answers list, report and classify requests."""
+    from transactions_server import serve
+    transactions_access = open_transactions_access(obj['store'])
+    classification_engine = ClassificationEngine(load_rules(rules), compiled=compiled) if rules else None
+    if engine == 'numpy':
+        from numpy_report_access import NumpyReportAccess
+        report_access = NumpyReportAccess()
+    else:
+        report_access = ReportAccess()
+    serve(ReportingManager(transactions_access, classification_engine, report_access), host, port, socket_path)
+
+@cli.command(name='compact')
+@click.pass_obj
+def compact_command(obj):
+    """Folds the label changes saved since the store was last written in full into the store."""
+    transactions_access = open_transactions_access(obj['store'])
+    transactions_access.compact()
+    transactions_access.close()
+    print(f"Compacted {obj['store']}.")
+
+@cli.command(name='convert')
+@click.argument('storage_file', type=click.Path(exists=True, dir_okay=False))
+@click.argument('store')
+def convert_command(storage_file, store):
+    """Copies a CSV transactions store into a new SQLite or columnar store."""
+    target_access = open_transactions_access(store)
+    if next(target_access.iter_label_amounts('0001-01-01', '9999-12-31'), None) is not None:
+        raise click.ClickException(f"Store {store} already holds transactions.")
+    transactions_access = TransactionsAccess(storage_file)
+    target_access.append_transactions(transactions_access.transactions)
+    target_access.close()
+    print(f"Converted {len(transactions_access.transactions)} transactions.")
 
 if __name__ == '__main__':
     cli()
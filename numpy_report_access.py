@@ -0,0 +1,144 @@
+import numpy as np
+from itertools import islice
+from typing import Iterable, Sequence
+from report_access import IReportAccess
+from transaction import Transaction
+
+class NumpyReportAccess(IReportAccess):
+    uses_columns = True
+
+    def __init__(self, chunk_size: int = 1_000_000) -> None:
+        """
+        Initialize NumpyReportAccess, which sums amounts per label with grouped array reductions.
+
+        Args:
+            chunk_size (int): Number of (label, amount) pairs converted to arrays at a
+                time when reporting from a stream. Defaults to 1000000.
+        """
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def _label_order(codes: np.ndarray, counts: np.ndarray) -> list[int]:
+        """
+        Get the codes present in a column, ordered by their first appearance.
+
+        Labels usually all show up early, so blocks of doubling size are scanned
+        from the start until every present code has been seen, rather than
+        sorting the whole column.
+
+        Args:
+            codes (np.ndarray): Label code of each transaction.
+            counts (np.ndarray): Number of transactions with each code.
+
+        Returns:
+            List[int]: Distinct codes, in the order a row-by-row report would meet them.
+        """
+        remaining = int(np.count_nonzero(counts))
+        order: list[int] = []
+        seen = set()
+        start, block = 0, 1024
+        while len(order) < remaining:
+            present, first_rows = np.unique(codes[start:start + block], return_index=True)
+            for code in present[np.argsort(first_rows)].tolist():
+                if code not in seen:
+                    seen.add(code)
+                    order.append(code)
+            start += block
+            block *= 2
+        return order
+
+    def generate_report_columns(self, label_codes: Sequence[int], amounts: Sequence[int], label_names: list[str]) -> dict[str, float]:
+        """
+        Generate a report summary from columns of label codes and amounts in cents.
+
+        Args:
+            label_codes (Sequence[int]): Index into label_names of each transaction's label.
+            amounts (Sequence[int]): Amount of each transaction, in cents.
+            label_names (List[str]): Label of each code.
+
+        Returns:
+            Dict[str, float]: Summary of transactions with labels and total amount.
+        """
+        codes = np.asarray(label_codes, dtype=np.intp)
+        counts = np.bincount(codes, minlength=len(label_names))
+        # Cents are whole numbers, so their float64 sums are exact
+        totals = np.bincount(codes, weights=np.asarray(amounts, dtype=np.float64), minlength=len(label_names)).tolist()
+        summary = {label_names[code]: totals[code] / 100 for code in self._label_order(codes, counts)}
+        summary['Total'] = sum(summary.values())
+        return summary
+
+    def describe_columns(self, label_codes: Sequence[int], amounts: Sequence[int], label_names: list[str]) -> dict[str, dict[str, float]]:
+        """
+        Compute count, total, mean, minimum and maximum amount per label.
+
+        Args:
+            label_codes (Sequence[int]): Index into label_names of each transaction's label.
+            amounts (Sequence[int]): Amount of each transaction, in cents.
+            label_names (List[str]): Label of each code.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Statistics of each label present, in order of first appearance.
+        """
+        codes = np.asarray(label_codes, dtype=np.intp)
+        cents = np.asarray(amounts, dtype=np.int64)
+        if not len(codes):
+            return {}
+        counts = np.bincount(codes, minlength=len(label_names))
+        totals = np.bincount(codes, weights=cents.astype(np.float64), minlength=len(label_names))
+        minimums = np.full(len(label_names), np.iinfo(np.int64).max)
+        maximums = np.full(len(label_names), np.iinfo(np.int64).min)
+        np.minimum.at(minimums, codes, cents)
+        np.maximum.at(maximums, codes, cents)
+        order = self._label_order(codes, counts)
+        counts, totals, minimums, maximums = counts.tolist(), totals.tolist(), minimums.tolist(), maximums.tolist()
+        stats = {}
+        for code in order:
+            stats[label_names[code]] = {
+                'count': counts[code],
+                'total': totals[code] / 100,
+                'mean': totals[code] / 100 / counts[code],
+                'min': minimums[code] / 100,
+                'max': maximums[code] / 100,
+            }
+        return stats
+
+    def generate_report_stream(self, label_amounts: Iterable[tuple[str, float]]) -> dict[str, float]:
+        """
+        Generate a report summary from a stream of (label, amount) pairs.
+
+        Pairs are converted to arrays one chunk at a time, so memory stays bounded.
+
+        Args:
+            label_amounts (Iterable[Tuple[str, float]]): Label and amount of each transaction.
+
+        Returns:
+            Dict[str, float]: Summary of transactions with labels and total amount.
+        """
+        codes: dict[str, int] = {}
+        totals = np.zeros(0)
+        label_amounts = iter(label_amounts)
+        while True:
+            chunk = list(islice(label_amounts, self.chunk_size))
+            if not chunk:
+                break
+            chunk_codes = np.fromiter((codes.setdefault(label, len(codes)) for label, _ in chunk), dtype=np.intp, count=len(chunk))
+            chunk_amounts = np.fromiter((amount for _, amount in chunk), dtype=np.float64, count=len(chunk))
+            chunk_totals = np.bincount(chunk_codes, weights=np.rint(chunk_amounts * 100), minlength=len(codes))
+            totals = np.pad(totals, (0, len(codes) - len(totals))) + chunk_totals
+        totals = totals.tolist()
+        # codes is in order of first appearance already
+        summary = {label: totals[code] / 100 for label, code in codes.items()}
+        summary['Total'] = sum(summary.values())
+        return summary
+
+    def generate_report(self, transactions: list[Transaction]) -> dict[str, float]:
+        """
+        Generate a report summary based on the given transactions.
+
+        Args:
+            transactions (List[Dict[str, Any]]): List of transaction dictionaries.
+
+        Returns:
+            Dict[str, float]: Summary of transactions with labels and total amount.
+        """
+        return self.generate_report_stream((transaction.get('label', 'Unclassified'), transaction['amount']) for transaction in transactions)
@@ -1,29 +1,148 @@
 from abc import abstractmethod, ABCMeta
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable, Sequence
+from transaction import Transaction
+
+PERIOD_GROUPINGS = ('day', 'week', 'month', 'year')
+
+def period_windows(start_date: datetime, end_date: datetime, group_by: str) -> list[tuple[str, datetime, datetime]]:
+    """
+    Split a range of days into calendar periods.
+
+    Weeks start on Monday and are named by their ISO year and week number. The
+    first and last period are cut short to the range.
+
+    Args:
+        start_date (datetime): First day of the range.
+        end_date (datetime): Last day of the range, inclusive.
+        group_by (str): One of PERIOD_GROUPINGS.
+
+    Returns:
+        List[Tuple[str, datetime, datetime]]: Name, inclusive start and exclusive end of each period, in date order.
+
+    Raises:
+        ValueError: If group_by is not one of PERIOD_GROUPINGS.
+    """
+    if group_by not in PERIOD_GROUPINGS:
+        raise ValueError(f"Unknown period {group_by}, expected one of {', '.join(PERIOD_GROUPINGS)}")
+    start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    windows = []
+    period_start = start_date
+    while period_start < end_date:
+        if group_by == 'day':
+            name = period_start.strftime('%Y-%m-%d')
+            next_start = period_start + timedelta(days=1)
+        elif group_by == 'week':
+            year, week, weekday = period_start.isocalendar()
+            name = f"{year}-W{week:02d}"
+            next_start = period_start + timedelta(days=8 - weekday)
+        elif group_by == 'month':
+            name = period_start.strftime('%Y-%m')
+            next_start = datetime(period_start.year + period_start.month // 12, period_start.month % 12 + 1, 1)
+        else:
+            name = period_start.strftime('%Y')
+            next_start = datetime(period_start.year + 1, 1, 1)
+        windows.append((name, period_start, min(next_start, end_date)))
+        period_start = next_start
+    return windows
 
 class IReportAccess(metaclass=ABCMeta):
+    # Engines that set this are given label code and amount columns instead of a stream of pairs
+    uses_columns = False
+
+    @abstractmethod
+    def generate_report(self, transactions: list[Transaction]) -> dict[str, float]:
+        raise NotImplementedError
+
     @abstractmethod
-    def generate_report(self, transactions: list[dict[str, any]]) -> dict[str, float]:
+    def generate_report_stream(self, label_amounts: Iterable[tuple[str, float]]) -> dict[str, float]:
         raise NotImplementedError
 
+    def generate_report_columns(self, label_codes: Sequence[int], amounts: Sequence[int], label_names: list[str]) -> dict[str, float]:
+        """
+        Generate a report summary from columns of label codes and amounts in cents.
+
+        Args:
+            label_codes (Sequence[int]): Index into label_names of each transaction's label.
+            amounts (Sequence[int]): Amount of each transaction, in cents.
+            label_names (List[str]): Label of each code.
+
+        Returns:
+            Dict[str, float]: Summary of transactions with labels and total amount.
+        """
+        return self.generate_report_stream((label_names[code], amount / 100) for code, amount in zip(label_codes, amounts))
+
+    def generate_period_report(self, dated_label_amounts: Iterable[tuple[datetime, str, float]], periods: list[tuple[str, datetime, datetime]]) -> dict[str, dict[str, float]]:
+        """
+        Generate a report summary for each of several periods in a single pass.
+
+        Each (date, label, amount) triple is added to the period it falls in, found
+        by bisecting the period starts. Triples usually come in date order, so the
+        period of the previous triple is checked first.
+
+        Args:
+            dated_label_amounts (Iterable[Tuple[datetime, str, float]]): Date, label and amount of each transaction or daily total.
+            periods (List[Tuple[str, datetime, datetime]]): Name, inclusive start and exclusive
+                end of each period, sorted by start and not overlapping.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Summary of each period by name, in the order given,
+            with labels and total amount. Periods without transactions only have a zero total.
+        """
+        starts = [start for _, start, _ in periods]
+        summaries: list[dict[str, float]] = [{} for _ in periods]
+        start = end = summary = None
+        for date, label, amount in dated_label_amounts:
+            if start is None or not start <= date < end:
+                index = bisect_right(starts, date) - 1
+                if index < 0 or date >= periods[index][2]:
+                    start = None
+                    continue
+                _, start, end = periods[index]
+                summary = summaries[index]
+            summary[label] = summary.get(label, 0.0) + amount
+        report = {}
+        for (name, _, _), summary in zip(periods, summaries):
+            summary['Total'] = sum(summary.values())
+            report[name] = summary
+        return report
+
 class ReportAccess(IReportAccess):
     @staticmethod
-    def generate_report(transactions: list[dict[str, any]]) -> dict[str, float]:
+    def generate_report(transactions: list[Transaction]) -> dict[str, float]:
         """
         Generate a report summary based on the given transactions.
 
         Args:
             transactions (List[Dict[str, Any]]): List of transaction dictionaries.
 
+        Returns:
+            Dict[str, float]: Summary of transactions with labels and total amount.
+        """
+        # Ensure every transaction has a label, defaulting to 'Unclassified' if none is present
+        return ReportAccess.generate_report_stream((transaction.get('label', 'Unclassified'), transaction['amount']) for transaction in transactions)
+
+    @staticmethod
+    def generate_report_stream(label_amounts: Iterable[tuple[str, float]]) -> dict[str, float]:
+        """
+        Generate a report summary from a stream of (label, amount) pairs.
+
+        Only the running total of each label is kept, so the pairs can come straight
+        from storage without building a list of transactions.
+
+        Args:
+            label_amounts (Iterable[Tuple[str, float]]): Label and amount of each transaction.
+
         Returns:
             Dict[str, float]: Summary of transactions with labels and total amount.
         """
         summary = {}  # Initialize an empty dictionary to store the summary
-        for transaction in transactions:
-            # Ensure every transaction has a label, defaulting to 'Unclassified' if none is present
-            label = transaction.get('label', 'Unclassified')
+        for label, amount in label_amounts:
             if label not in summary:
                 summary[label] = 0.0  # Initialize label's total amount to zero if not already present
-            summary[label] += transaction['amount']  # Add transaction amount to the label's total
+            summary[label] += amount  # Add transaction amount to the label's total
         
         total = sum(summary.values())  # total amount by summing all label totals
         summary['Total'] = total  #'Total' key to the summary with the calculated total amount
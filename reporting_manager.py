@@ -1,54 +1,158 @@
-from transactions_access import TransactionsAccess
+import os
+import time
+from datetime import datetime, timedelta
+from transactions_access import ImportCheckpoint, ITransactionsAccess, read_transaction_chunks, read_transactions_file
 from classification_engine import ClassificationEngine
-from report_access import ReportAccess
+from report_access import IReportAccess, period_windows
+from transaction import Transaction
 from rule_access import RuleAccess
+from timings import stage
+from transaction_output import ITransactionOutput, TableOutput
 from typing import Optional
 
 class ReportingManager:
-    def __init__(self, transactions_access: TransactionsAccess, classification_engine: Optional[ClassificationEngine], report_access: Optional[ReportAccess]) -> None:
+    def __init__(self, transactions_access: ITransactionsAccess, classification_engine: Optional[ClassificationEngine], report_access: Optional[IReportAccess]) -> None:
         """
         Initialize the ReportingManager with access to transaction, classification, and report functionality.
 
         Args:
-            transactions_access (TransactionsAccess): Object providing access to transaction data.
+            transactions_access (ITransactionsAccess): Object providing access to transaction data.
             classification_engine (ClassificationEngine, optional): Object providing classification functionality.
-            report_access (ReportAccess, optional): Object providing access to report generation.
+            report_access (IReportAccess, optional): Object providing access to report generation.
         """
         self.transactions_access = transactions_access
         self.classification_engine = classification_engine
         self.report_access = report_access
 
-    def import_transactions(self, transactions_file: str) -> None:
+    def import_transactions(self, transactions_file: str, chunk_size: Optional[int] = None, resume: bool = False, skip_duplicates: bool = True) -> None:
         """
         Import transactions from a file and save them to storage.
 
         Args:
             transactions_file (str): Path to the CSV file containing transactions.
+            chunk_size (int, optional): Parse and store the file this many transactions
+                at a time, printing progress after each chunk and checkpointing how far
+                the import got. Defaults to None, which imports the file in one go.
+            resume (bool): Continue from the checkpoint of an earlier chunked import
+                of the same file that stopped part way. Defaults to False.
+            skip_duplicates (bool): Leave out transactions that are already in the store,
+                if the store keeps a duplicate index. Defaults to True.
         """
-        self.transactions_access.import_transactions(transactions_file)
-        print(f"Imported {len(self.transactions_access.transactions)} transactions.")
+        with stage('import: open duplicate index'):
+            duplicate_index = self.transactions_access.get_duplicate_index() if skip_duplicates else None
+        # Stored transactions that no row of the file has matched yet, for the keys met so far
+        unmatched: dict[int, int] = {}
+        checkpoint = ImportCheckpoint(transactions_file, self.transactions_access.import_checkpoint_file(transactions_file)) if chunk_size else None
+        if checkpoint and resume and checkpoint.load():
+            print(f"Resuming after {checkpoint.rows} transactions.")
+            if duplicate_index is not None:
+                # Rows before the checkpoint match stored transactions before the rest do
+                for chunk, offset in read_transaction_chunks(transactions_file, 1):
+                    if offset > checkpoint.offset:
+                        break
+                    duplicate_index.count_occurrences(chunk, unmatched)
 
-    def classify_transactions(self, start_date: str, end_date: str) -> None:
+        if checkpoint:
+            chunks = read_transaction_chunks(transactions_file, chunk_size, checkpoint.offset)
+        else:
+            chunks = iter([(read_transactions_file(transactions_file), None)])
+        file_size = os.path.getsize(transactions_file)
+        stored = skipped = 0
+        start = time.perf_counter()
+        try:
+            while True:
+                # Chunks are parsed as they are read, so time each read as its own stage
+                with stage('import: parse') as timed:
+                    chunk, offset = next(chunks, (None, None))
+                    timed.rows = len(chunk) if chunk else 0
+                if chunk is None:
+                    break
+                with stage('import: deduplicate') as timed:
+                    new_transactions = chunk if duplicate_index is None else duplicate_index.filter_new(chunk, unmatched)
+                    timed.rows = len(chunk)
+                if new_transactions:
+                    with stage('import: store') as timed:
+                        self.transactions_access.append_transactions(new_transactions)
+                        if duplicate_index is not None:
+                            duplicate_index.add(new_transactions)
+                        timed.rows = len(new_transactions)
+                stored += len(new_transactions)
+                skipped += len(chunk) - len(new_transactions)
+                if checkpoint:
+                    checkpoint.save(offset, checkpoint.rows + len(chunk))
+                    rate = (stored + skipped) / max(time.perf_counter() - start, 1e-9)
+                    print(f"{checkpoint.rows} transactions read ({offset / file_size:.0%} of file, {rate:,.0f} transactions/s)")
+        except ValueError:
+            if checkpoint:
+                print(f"Import stopped after {checkpoint.rows} transactions; fix the file and import it again with --resume to continue.")
+            raise
+        finally:
+            if duplicate_index is not None:
+                duplicate_index.close()
+        if checkpoint:
+            checkpoint.clear()
+        if duplicate_index is None:
+            print(f"Imported {stored} transactions.")
+        else:
+            print(f"Imported {stored} transactions, skipped {skipped} already in the store.")
+
+    def classify(self, start_date: str, end_date: str, incremental: bool = False) -> list[Transaction]:
+        """
+        Classify transactions within a date range and save their labels.
+
+        Args:
+            start_date (str): Start date for the transaction classification.
+            end_date (str): End date for the transaction classification.
+            incremental (bool): Only classify transactions that are unclassified or were
+                labelled by a different rule set than the current one. Defaults to False.
+
+        Returns:
+            List[Transaction]: The transactions that were classified.
+        """
+        with stage('query') as timed:
+            transactions = self.transactions_access.get_transactions(start_date, end_date)
+            if incremental:
+                rule_version = self.classification_engine.rule_access.get_fingerprint()
+                transactions = [txn for txn in transactions if txn.label == 'Unclassified' or txn.rule_version != rule_version]
+            timed.rows = len(transactions)
+        with stage('classify') as timed:
+            self.classification_engine.classify_transactions(transactions)
+            timed.rows = len(transactions)
+        if transactions:
+            with stage('save') as timed:
+                self.transactions_access.save_transactions()
+                timed.rows = len(transactions)
+        return transactions
+
+    def classify_transactions(self, start_date: str, end_date: str, incremental: bool = False, output: Optional[ITransactionOutput] = None, quiet: bool = False) -> None:
         """
         Classify transactions within a date range using classification rules.
 
         Args:
             start_date (str): Start date for the transaction classification.
             end_date (str): End date for the transaction classification.
+            incremental (bool): Only classify transactions that are unclassified or were
+                labelled by a different rule set than the current one. Defaults to False.
+            output (ITransactionOutput, optional): Output to write the classified transactions
+                to. Defaults to a table on standard output.
+            quiet (bool): Only print the counts, not each transaction. Defaults to False.
         """
-        transactions = self.transactions_access.get_transactions(start_date, end_date)
-        self.classification_engine.classify_transactions(transactions)
-        self.transactions_access.save_transactions()
+        if output is None:
+            output = TableOutput(classified=True)
+        cache_info = self.classification_engine.cache_info()
+        transactions = self.classify(start_date, end_date, incremental)
 
-        # Print classification output for each transaction
-        for txn in transactions:
-            if txn['label'] == 'Unclassified':
-                print(f"{txn['date'].strftime('%Y-%m-%d')} {txn['description']}: {txn['amount']} unable to classify")
-            else:
-                print(f"{txn['date'].strftime('%Y-%m-%d')} {txn['description']}: {txn['amount']} classified as {txn['label']}")
-        print(f"{len(transactions)} transactions processed")
+        if not quiet:
+            with stage('output') as timed:
+                timed.rows = output.write(transactions)
+        print(f"{len(transactions)} transactions processed", file=output.summary_stream)
+        # Worker processes do not use the engine's cache, so it has nothing to report then
+        if cache_info.maxsize and self.classification_engine.workers == 1:
+            hits = self.classification_engine.cache_hits - cache_info.hits
+            misses = self.classification_engine.cache_misses - cache_info.misses
+            print(f"{hits} cached, {misses} matched against rules", file=output.summary_stream)
 
-    def list_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> None:
+    def list_transactions(self, start_date: str, end_date: str, label: Optional[str] = None, output: Optional[ITransactionOutput] = None) -> None:
         """
         List transactions within a date range and optional label filter.
 
@@ -56,16 +160,19 @@ class ReportingManager:
             start_date (str): Start date for listing transactions.
             end_date (str): End date for listing transactions.
             label (str, optional): Filter transactions by label. Defaults to None.
+            output (ITransactionOutput, optional): Output to write the transactions to.
+                Defaults to a table on standard output.
         """
-        transactions = self.transactions_access.get_transactions(start_date, end_date, label)
-        for txn in transactions:
-            label_display = f"[{txn['label']}]" if txn['label'] else "[]"
-            print(f"{txn['date'].strftime('%Y-%m-%d')} {txn['description']}: {txn['amount']} {label_display}")
-        print(f"{len(transactions)} transactions listed")
+        if output is None:
+            output = TableOutput()
+        # Transactions are streamed from the store into the output, as they are only read
+        with stage('query and output') as timed:
+            timed.rows = output.write(self.transactions_access.iter_transactions(start_date, end_date, label))
+        print(f"{timed.rows} transactions listed", file=output.summary_stream)
 
-    def generate_report(self, start_date: str, end_date: str) -> dict[str, float]:
+    def summarise(self, start_date: str, end_date: str) -> dict[str, float]:
         """
-        Generate a report for transactions within a date range.
+        Sum the transactions of each label within a date range.
 
         Args:
             start_date (str): Start date for the report.
@@ -74,8 +181,89 @@ class ReportingManager:
         Returns:
             Dict[str, float]: Summary report with labels and total amounts.
         """
-        transactions = self.transactions_access.get_transactions(start_date, end_date)
-        report = self.report_access.generate_report(transactions)
-        for label, amount in report.items():
-            print(f"{label}: {amount:.2f}")
+        if self.report_access.uses_columns:
+            columns = self.transactions_access.get_label_amount_columns(start_date, end_date)
+            return self.report_access.generate_report_columns(*columns)
+        label_amounts = self.transactions_access.iter_label_totals(start_date, end_date)
+        return self.report_access.generate_report_stream(label_amounts)
+
+    def summarise_periods(self, periods: list[tuple[str, str]]) -> dict[str, dict[str, float]]:
+        """
+        Sum the transactions of each label within each of several date ranges.
+
+        The store is read once, from the start of the first range to the end of the
+        last, however many ranges there are.
+
+        Args:
+            periods (List[Tuple[str, str]]): Start and end date, inclusive, of each
+                range. The ranges must not overlap.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Summary report of each range, keyed by
+            'start to end', with labels and total amounts.
+
+        Raises:
+            ValueError: If two ranges overlap.
+        """
+        windows = []
+        for start_date, end_date in periods:
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+            windows.append((f"{start_date} to {end_date}", start, datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)))
+        windows.sort(key=lambda window: window[1])
+        for previous, window in zip(windows, windows[1:]):
+            if window[1] < previous[2]:
+                raise ValueError(f"Periods {previous[0]} and {window[0]} overlap")
+        report = self._summarise_windows(windows)
+        return {f"{start_date} to {end_date}": report[f"{start_date} to {end_date}"] for start_date, end_date in periods}
+
+    def summarise_by(self, start_date: str, end_date: str, group_by: str) -> dict[str, dict[str, float]]:
+        """
+        Sum the transactions of each label within each calendar period of a date range.
+
+        Args:
+            start_date (str): Start date for the report.
+            end_date (str): End date for the report.
+            group_by (str): Length of the periods: day, week, month or year.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Summary report of each period in date order,
+            with labels and total amounts.
+        """
+        windows = period_windows(datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d'), group_by)
+        return self._summarise_windows(windows)
+
+    def _summarise_windows(self, windows: list[tuple[str, datetime, datetime]]) -> dict[str, dict[str, float]]:
+        """
+        Sum the transactions of each label within sorted, non-overlapping periods in one pass over the store.
+        """
+        if not windows:
+            return {}
+        start_date = windows[0][1].strftime('%Y-%m-%d')
+        end_date = (windows[-1][2] - timedelta(days=1)).strftime('%Y-%m-%d')
+        return self.report_access.generate_period_report(self.transactions_access.iter_dated_label_totals(start_date, end_date), windows)
+
+    def generate_report(self, start_date: str, end_date: str, group_by: Optional[str] = None) -> dict:
+        """
+        Generate a report for transactions within a date range.
+
+        Args:
+            start_date (str): Start date for the report.
+            end_date (str): End date for the report.
+            group_by (str, optional): Report each day, week, month or year of the range
+                separately. Defaults to None, which reports the range as a whole.
+
+        Returns:
+            Dict: Summary report with labels and total amounts, or with group_by a
+            summary report of each period.
+        """
+        with stage('report') as timed:
+            report = self.summarise_by(start_date, end_date, group_by) if group_by else self.summarise(start_date, end_date)
+            timed.rows = len(report)
+        with stage('output') as timed:
+            if group_by:
+                lines = [f"{period} {label}: {amount:.2f}\n" for period, summary in report.items() for label, amount in summary.items()]
+            else:
+                lines = [f"{label}: {amount:.2f}\n" for label, amount in report.items()]
+            print(''.join(lines), end='')
+            timed.rows = len(lines)
         return report
@@ -1,4 +1,5 @@
 import csv
+import hashlib
 import re
 from abc import abstractmethod, ABCMeta
 
@@ -11,6 +12,10 @@ class IRuleAccess(metaclass=ABCMeta):
     def get_rules(self) -> list[dict[str, any]]:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_fingerprint(self) -> str:
+        raise NotImplementedError
+
 class RuleAccess(IRuleAccess):
     def __init__(self, rules_file: str) -> None:
         """
@@ -20,6 +25,7 @@ class RuleAccess(IRuleAccess):
             rules_file (str): Path to the CSV file containing classification rules.
         """
         self.rules: list[dict[str, any]] = []
+        self.fingerprint = ''
         self.load_rules(rules_file)
 
     def load_rules(self, rules_file: str) -> None:
@@ -38,6 +44,23 @@ class RuleAccess(IRuleAccess):
             headers = reader.fieldnames
             for row in reader:
                 self.rules.append({'pattern': re.compile(row['pattern']), 'label': row['label']})
+        self.fingerprint = self.compute_fingerprint(self.rules)
+
+    @staticmethod
+    def compute_fingerprint(rules: list[dict[str, any]]) -> str:
+        """
+        Compute a fingerprint identifying a rule set.
+
+        Args:
+            rules (list): Rule dictionaries with compiled 'pattern' and 'label' keys.
+
+        Returns:
+            str: Hex digest that changes whenever a pattern, flag, label or the rule order changes.
+        """
+        digest = hashlib.sha1()
+        for rule in rules:
+            digest.update(f"{rule['pattern'].pattern}\x1f{rule['pattern'].flags}\x1f{rule['label']}\x1e".encode('utf-8'))
+        return digest.hexdigest()[:16]
 
     def get_rules(self) -> list[dict[str, any]]:
         """
@@ -46,4 +69,13 @@ class RuleAccess(IRuleAccess):
         Returns:
             List[Dict[str, Any]]: A list of dictionaries containing 'pattern' and 'label'.
         """
-        return self.rules
\ No newline at end of file
+        return self.rules
+
+    def get_fingerprint(self) -> str:
+        """
+        Get the fingerprint of the loaded rule set.
+
+        Returns:
+            str: Hex digest computed when the rules were last loaded.
+        """
+        return self.fingerprint
@@ -0,0 +1,130 @@
+import re
+from typing import Optional
+
+# Characters with a special meaning in a regex pattern
+_SPECIAL_CHARACTERS = set('.^$*+?{}[]\\|()')
+
+def literal_alternatives(pattern: str) -> Optional[list[str]]:
+    """
+    Split a pattern that is a plain alternation of literal strings.
+
+    Args:
+        pattern (str): Regex pattern, e.g. 'coffee|food|bistro'.
+
+    Returns:
+        list or None: The literal alternatives, or None if the pattern uses any
+        other regex syntax (escaped punctuation such as '\\-' is accepted).
+    """
+    alternatives = []
+    current = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 == len(pattern) or pattern[i + 1].isalnum() or pattern[i + 1] == '_':
+                return None  # Character classes, anchors and backreferences
+            current.append(pattern[i + 1])
+            i += 2
+            continue
+        if char == '|':
+            alternatives.append(''.join(current))
+            current = []
+        elif char in _SPECIAL_CHARACTERS:
+            return None
+        else:
+            current.append(char)
+        i += 1
+    alternatives.append(''.join(current))
+    if '' in alternatives:
+        return None  # An empty branch matches every description
+    return alternatives
+
+class CompiledRuleMatcher:
+    def __init__(self, rules: list[dict[str, any]]) -> None:
+        """
+        Build a matcher that checks every rule in a single pass over a description.
+
+        Rules that are alternations of literal strings, which is what merchant
+        rules usually look like, are merged into one Aho-Corasick automaton.
+        The remaining rules are arbitrary regexes and are searched in rule order,
+        but only those ranked ahead of the best literal match.
+
+        Args:
+            rules (list): Rule dictionaries with 'pattern' and 'label' keys, in priority order.
+        """
+        self.labels = [rule['label'] for rule in rules]
+        self.regex_rules: list[tuple[int, re.Pattern]] = []
+        # Automaton states: transitions, failure link and the lowest rule index
+        # whose literal ends at the state (len(rules) when none does)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[int] = [len(rules)]
+        for index, rule in enumerate(rules):
+            pattern = re.compile(rule['pattern'])
+            alternatives = literal_alternatives(pattern.pattern) if pattern.flags == re.U else None
+            if alternatives is None:
+                self.regex_rules.append((index, pattern))
+            else:
+                for literal in alternatives:
+                    self._add_literal(literal, index)
+        self._build_failure_links()
+
+    def _add_literal(self, literal: str, index: int) -> None:
+        """
+        Add a literal string to the automaton trie.
+
+        Args:
+            literal (str): Literal to match anywhere in a description.
+            index (int): Index of the rule the literal belongs to.
+        """
+        state = 0
+        for char in literal:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(len(self.labels))
+            state = next_state
+        self._output[state] = min(self._output[state], index)
+
+    def _build_failure_links(self) -> None:
+        """
+        Compute failure links breadth first, folding in the outputs of suffix states.
+        """
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = min(self._output[next_state], self._output[self._fail[next_state]])
+                queue.append(next_state)
+
+    def match(self, description: str) -> Optional[str]:
+        """
+        Find the label of the first rule, in rule order, that matches a description.
+
+        Args:
+            description (str): Lower-cased transaction description.
+
+        Returns:
+            str or None: Label of the first matching rule, or None if no rule matches.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        best = len(self.labels)
+        state = 0
+        for char in description:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] < best:
+                best = output[state]
+        for index, pattern in self.regex_rules:
+            if index > best:
+                break
+            if pattern.search(description):
+                return self.labels[index]
+        return self.labels[best] if best < len(self.labels) else None
@@ -0,0 +1,183 @@
+import sqlite3
+from datetime import datetime
+from typing import Iterator, Optional
+from transaction import Transaction
+from transactions_access import DateParser, ITransactionsAccess, import_checkpoint_name, read_transactions_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    rule_version TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS transactions_date_label ON transactions (date, label);
+"""
+
+class SqliteTransactionsAccess(ITransactionsAccess):
+    def __init__(self, database_file: str = 'transactions.db') -> None:
+        """
+        Initialize SqliteTransactionsAccess with a SQLite database file.
+
+        Dates are stored as year-month-day text, which sorts chronologically, and
+        amounts as integer cents. Queries use an index on (date, label), so nothing
+        is loaded up front.
+
+        Args:
+            database_file (str): Path to the database file. Defaults to 'transactions.db'.
+        """
+        self.database_file = database_file
+        # The connection may be shared by the threads of the server, which serialise writes
+        self.connection = sqlite3.connect(database_file, check_same_thread=False)
+        # Transactions handed out by get_transactions, by id, with the label and
+        # rule version they had then, so that save_transactions only updates changes
+        self._checked_out: dict[int, tuple[Transaction, str, str]] = {}
+        self.load_transactions()
+
+    def load_transactions(self) -> None:
+        """
+        Create the table and index if the database is new.
+        """
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def save_transactions(self) -> None:
+        """
+        Write the label changes of the transactions handed out by get_transactions.
+
+        Only rows whose label or rule version changed are updated, in one batch.
+        """
+        updates = [
+            (transaction.label, transaction.rule_version, row_id)
+            for row_id, (transaction, label, rule_version) in self._checked_out.items()
+            if transaction.label != label or transaction.rule_version != rule_version
+        ]
+        self._checked_out.clear()
+        if updates:
+            with self.connection:
+                self.connection.executemany('UPDATE transactions SET label = ?, rule_version = ? WHERE id = ?', updates)
+
+    def append_transactions(self, transactions: list[Transaction]) -> None:
+        """
+        Insert transactions into the database in a single database transaction.
+
+        Args:
+            transactions (list): Parsed transactions to add.
+        """
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO transactions (date, description, amount, label, rule_version) VALUES (?, ?, ?, ?, ?)',
+                ((txn.date.strftime('%Y-%m-%d'), txn.description, round(txn.amount * 100), txn.label, txn.rule_version) for txn in transactions),
+            )
+
+    def count_transactions(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+    def duplicate_index_file(self) -> Optional[str]:
+        return self.database_file + '.hashes'
+
+    def import_checkpoint_file(self, transactions_file: str) -> Optional[str]:
+        return f"{self.database_file}.{import_checkpoint_name(transactions_file)}"
+
+    def import_transactions(self, transactions_file: str) -> int:
+        """
+        Import transactions from a CSV file and save them to storage.
+
+        Args:
+            transactions_file (str): Path to the CSV file containing transactions.
+
+        Returns:
+            int: Number of transactions imported.
+        """
+        new_transactions = read_transactions_file(transactions_file)
+        self.append_transactions(new_transactions)
+        return len(new_transactions)
+
+    def _query_transactions(self, start_date: str, end_date: str, label: Optional[str]) -> Iterator[tuple[int, Transaction]]:
+        """
+        Yield the row id and a Transaction for each row within a date range and optional label.
+        """
+        query = 'SELECT id, date, description, amount, label, rule_version FROM transactions WHERE date BETWEEN ? AND ?'
+        parameters = [start_date, end_date]
+        if label:
+            query += ' AND label = ?'
+            parameters.append(label)
+        parse_date = DateParser(['%Y-%m-%d'])
+        for row_id, date, description, amount, row_label, rule_version in self.connection.execute(query + ' ORDER BY date, id', parameters):
+            yield row_id, Transaction(parse_date(date), description, amount / 100, row_label, rule_version)
+
+    def get_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> list[Transaction]:
+        """
+        Get transactions within a specified date range and optionally filtered by label.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+            label (str, optional): Filter transactions by label. Defaults to None.
+
+        Returns:
+            List[Transaction]: List of filtered transactions, in date order.
+        """
+        transactions = []
+        for row_id, transaction in self._query_transactions(start_date, end_date, label):
+            self._checked_out[row_id] = (transaction, transaction.label, transaction.rule_version)
+            transactions.append(transaction)
+        return transactions
+
+    def iter_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> Iterator[Transaction]:
+        for _, transaction in self._query_transactions(start_date, end_date, label):
+            yield transaction
+
+    def iter_label_amounts(self, start_date: str, end_date: str) -> Iterator[tuple[str, float]]:
+        """
+        Yield the label and amount of each transaction within a date range.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[str, float]: Label and amount of a transaction, in date order.
+        """
+        for label, amount in self.connection.execute('SELECT label, amount FROM transactions WHERE date BETWEEN ? AND ? ORDER BY date, id', (start_date, end_date)):
+            yield label, amount / 100
+
+    def iter_label_totals(self, start_date: str, end_date: str) -> Iterator[tuple[str, float]]:
+        """
+        Yield the total of each label within a date range, summed by SQLite.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[str, float]: A label and its total, ordered by the label's first transaction.
+        """
+        query = 'SELECT label, SUM(amount) FROM transactions WHERE date BETWEEN ? AND ? GROUP BY label ORDER BY MIN(date), MIN(id)'
+        for label, amount in self.connection.execute(query, (start_date, end_date)):
+            yield label, amount / 100
+
+    def iter_dated_label_totals(self, start_date: str, end_date: str) -> Iterator[tuple[datetime, str, float]]:
+        """
+        Yield the total of each label on each day within a date range, summed by SQLite.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[datetime, str, float]: A day, a label and its total that day, in date order.
+        """
+        query = 'SELECT date, label, SUM(amount) FROM transactions WHERE date BETWEEN ? AND ? GROUP BY date, label ORDER BY date, MIN(id)'
+        parse_date = DateParser(['%Y-%m-%d'])
+        for date, label, amount in self.connection.execute(query, (start_date, end_date)):
+            yield parse_date(date), label, amount / 100
+
+    def close(self) -> None:
+        """
+        Save pending label changes and close the database connection.
+        """
+        self.save_transactions()
+        self.connection.close()
@@ -24,3 +24,46 @@ def test_classify_transactions(classification_engine):
     classification_engine.classify_transactions(transactions)
     assert transactions[0]['label'] == 'Food'
     assert transactions[1]['label'] == 'Clothing'
+
+def test_classify_transactions_compiled():
+    classification_engine = ClassificationEngine(RuleAccess('examples/patterns.csv'), compiled=True)
+    transactions = [
+        {'description': "Ted's coffee", 'label': 'Unclassified'},
+        {'description': "Moe's Shiny Shoes", 'label': 'Unclassified'},
+        {'description': 'Maccas', 'label': 'Unclassified'}
+    ]
+    classification_engine.classify_transactions(transactions)
+    assert [txn['label'] for txn in transactions] == ['Food', 'Clothing', 'Unclassified']
+
+def test_classify_transactions_cache(classification_engine):
+    transactions = [{'description': description} for description in ['Rent', "Ted's coffee", 'RENT', 'rent', 'Maccas']]
+    classification_engine.classify_transactions(transactions)
+    assert [txn['label'] for txn in transactions] == ['Home', 'Food', 'Home', 'Home', 'Unclassified']
+    info = classification_engine.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 3, 3)
+
+def test_classify_transactions_cache_is_bounded():
+    classification_engine = ClassificationEngine(RuleAccess('examples/patterns.csv'), cache_size=2)
+    transactions = [{'description': description} for description in ['Rent', 'Coffee', 'Shoes', 'Rent']]
+    classification_engine.classify_transactions(transactions)
+    assert classification_engine.cache_info() == (0, 4, 2, 2)
+
+def test_cache_invalidated_when_rules_change(tmp_path):
+    rules_file = tmp_path / 'rules.csv'
+    rules_file.write_text('pattern,label\nmaccas,Fast food\n')
+    rule_access = RuleAccess('examples/patterns.csv')
+    classification_engine = ClassificationEngine(rule_access)
+    assert classification_engine.classify_transaction({'description': 'Maccas'}) == 'Unclassified'
+    rule_access.load_rules(str(rules_file))
+    assert classification_engine.classify_transaction({'description': 'Maccas'}) == 'Fast food'
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_classify_transactions_parallel(monkeypatch, compiled):
+    monkeypatch.setattr('classification_engine.PARALLEL_CHUNK_SIZE', 2)
+    rule_access = RuleAccess('examples/patterns.csv')
+    descriptions = ["Ted's coffee", "Moe's Shiny Shoes", 'Maccas', 'Rent', 'Power networks', 'Rent', 'Car repairs']
+    serial = [{'description': description} for description in descriptions]
+    parallel = [{'description': description} for description in descriptions]
+    ClassificationEngine(rule_access, compiled=compiled).classify_transactions(serial)
+    ClassificationEngine(rule_access, compiled=compiled, workers=2).classify_transactions(parallel)
+    assert parallel == serial
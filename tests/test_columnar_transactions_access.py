@@ -0,0 +1,118 @@
+import pytest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from columnar_transactions_access import ColumnarTransactionsAccess
+from transactions_access import TransactionsAccess
+from reporting_manager import ReportingManager
+from report_access import ReportAccess
+from rule_access import RuleAccess
+from classification_engine import ClassificationEngine
+
+@pytest.fixture
+def transactions_access(tmp_path):
+    ta = ColumnarTransactionsAccess(store_dir=str(tmp_path / 'store'))
+    yield ta
+    ta.close()
+
+@pytest.fixture
+def reporting_manager(transactions_access):
+    classification_engine = ClassificationEngine(RuleAccess('examples/patterns.csv'))
+    return ReportingManager(transactions_access, classification_engine, ReportAccess())
+
+def test_import_transactions(transactions_access):
+    assert transactions_access.import_transactions('examples/transactions.csv') == 7
+    transactions = transactions_access.get_transactions('2023-01-01', '2024-12-31')
+    assert len(transactions) == 7
+    assert transactions[0] == {'date': transactions[0]['date'], 'description': "Ted's coffee", 'amount': 6.5, 'label': 'Unclassified', 'rule_version': ''}
+    assert transactions[0]['date'].strftime('%Y-%m-%d') == '2023-01-01'
+    assert len(transactions_access.get_transactions('2023-01-01', '2024-01-01')) == 6
+    assert len(transactions_access.get_transactions('2023-02-03', '2023-02-03')) == 2
+
+def test_classify_and_reopen(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    assert len(transactions_access.get_transactions('2023-01-01', '2024-01-01', label='Home')) == 2
+    assert transactions_access.get_transactions('2023-01-01', '2024-01-01', label='Travel') == []
+
+    new_access = ColumnarTransactionsAccess(store_dir=transactions_access.store_dir)
+    home = new_access.get_transactions('2023-01-01', '2024-12-31', label='Home')
+    assert [(txn['description'], txn['amount']) for txn in home] == [('Rent', 950.0), ('Rent', 950.0)]
+    assert new_access.get_transactions('2024-01-05', '2024-01-05')[0]['label'] == 'Unclassified'
+    new_access.close()
+
+def test_import_out_of_order_keeps_dates_sorted(transactions_access, tmp_path):
+    late = tmp_path / 'late.csv'
+    late.write_text('date,description,amount\n1/6/2024,Bookshop,12.5\n')
+    transactions_access.import_transactions(str(late))
+    transactions_access.import_transactions('examples/transactions.csv')
+    transactions_access.import_transactions(str(late))
+    transactions = transactions_access.get_transactions('2023-01-01', '2024-12-31')
+    assert [txn['description'] for txn in transactions][-3:] == ['Car repairs', 'Bookshop', 'Bookshop']
+    assert list(transactions_access.dates.values) == sorted(transactions_access.dates.values)
+
+def test_import_out_of_order_interrupted(transactions_access, tmp_path, monkeypatch):
+    late = tmp_path / 'late.csv'
+    late.write_text('date,description,amount\n1/6/2024,Bookshop,12.5\n')
+    transactions_access.import_transactions(str(late))
+
+    def crash(*args, **kwargs):
+        raise OSError('disk full')
+
+    # Before the metadata commits the merge the stored rows are untouched
+    monkeypatch.setattr(transactions_access, '_write_meta', crash)
+    with pytest.raises(OSError):
+        transactions_access.import_transactions('examples/transactions.csv')
+    transactions_access.close()
+    new_access = ColumnarTransactionsAccess(store_dir=transactions_access.store_dir)
+    assert [txn['description'] for txn in new_access.get_transactions('2023-01-01', '2024-12-31')] == ['Bookshop']
+
+    # After it commits, reopening the store finishes moving the merged columns into place
+    monkeypatch.setattr(new_access, '_replace_merged_columns', crash)
+    with pytest.raises(OSError):
+        new_access.import_transactions('examples/transactions.csv')
+    new_access.close()
+    new_access = ColumnarTransactionsAccess(store_dir=transactions_access.store_dir)
+    transactions = new_access.get_transactions('2023-01-01', '2024-12-31')
+    assert [txn['description'] for txn in transactions][-2:] == ['Car repairs', 'Bookshop']
+    assert len(transactions) == 8
+    assert not [name for name in os.listdir(new_access.store_dir) if name.endswith('.tmp')]
+    new_access.close()
+
+def test_reopen_after_torn_append(transactions_access, tmp_path):
+    transactions_access.import_transactions('examples/transactions.csv')
+    expected = transactions_access.get_transactions('2023-01-01', '2024-12-31')
+    transactions_access.close()
+    # An append killed part way, after writing some bytes but before committing them
+    for name in ('dates.i32', 'amounts.i64', 'description_offsets.i64', 'description_text.dat'):
+        with open(os.path.join(transactions_access.store_dir, name), mode='ab') as file:
+            file.write(b'\x01\x02\x03')
+
+    new_access = ColumnarTransactionsAccess(store_dir=transactions_access.store_dir)
+    assert new_access.get_transactions('2023-01-01', '2024-12-31') == expected
+    late = tmp_path / 'late.csv'
+    late.write_text('date,description,amount\n1/6/2024,Bookshop,12.5\n')
+    new_access.import_transactions(str(late))
+    assert [txn['description'] for txn in new_access.get_transactions('2024-01-01', '2024-12-31')] == ['Car repairs', 'Bookshop']
+    new_access.close()
+
+def test_convert_from_csv_store(transactions_access, tmp_path):
+    csv_access = TransactionsAccess(storage_file=str(tmp_path / 'storage.csv'))
+    csv_access.import_transactions('examples/transactions.csv')
+    transactions_access.append_transactions(csv_access.transactions)
+    assert transactions_access.get_transactions('2023-01-01', '2024-12-31') == csv_access.get_transactions('2023-01-01', '2024-12-31')
+
+def test_iter_label_amounts(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    assert list(transactions_access.iter_label_amounts('2023-02-01', '2024-01-01')) == [('Home', 950.0), ('Utilities', 472.5), ('Home', 950.0)]
+    assert reporting_manager.generate_report('2023-01-01', '2024-01-01')['Total'] == 2653.98
+
+def test_iter_dated_label_totals(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    assert list(transactions_access.iter_dated_label_totals('2023-02-01', '2023-02-17')) == [
+        (datetime(2023, 2, 3), 'Home', 950.0), (datetime(2023, 2, 3), 'Utilities', 472.5), (datetime(2023, 2, 17), 'Home', 950.0),
+    ]
@@ -0,0 +1,53 @@
+import pytest
+import sys
+import os
+from array import array
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+pytest.importorskip('numpy')
+from numpy_report_access import NumpyReportAccess
+from report_access import ReportAccess
+from transactions_access import TransactionsAccess
+from reporting_manager import ReportingManager
+from rule_access import RuleAccess
+from classification_engine import ClassificationEngine
+
+TRANSACTIONS = [
+    {'amount': 6.50, 'label': 'Food'},
+    {'amount': 249.99, 'label': 'Clothing'},
+    {'amount': 24.99, 'label': 'Unclassified'},
+    {'amount': 950.00, 'label': 'Home'},
+    {'amount': 472.50, 'label': 'Utilities'},
+    {'amount': 950.00, 'label': 'Home'}
+]
+
+def test_generate_report_matches_dict_report():
+    report = NumpyReportAccess().generate_report(TRANSACTIONS)
+    assert report == ReportAccess.generate_report(TRANSACTIONS)
+    assert list(report) == ['Food', 'Clothing', 'Unclassified', 'Home', 'Utilities', 'Total']
+    assert report['Total'] == 2653.98
+
+def test_generate_report_stream_in_chunks():
+    report = NumpyReportAccess(chunk_size=4).generate_report_stream((txn['label'], txn['amount']) for txn in TRANSACTIONS)
+    assert report == ReportAccess.generate_report(TRANSACTIONS)
+
+def test_generate_report_columns():
+    label_names = ['Home', 'Food', 'Travel']
+    report = NumpyReportAccess().generate_report_columns(array('I', [1, 0, 1]), array('q', [650, 95000, 350]), label_names)
+    assert list(report.items()) == [('Food', 10.0), ('Home', 950.0), ('Total', 960.0)]
+    assert NumpyReportAccess().generate_report_columns(array('I'), array('q'), label_names) == {'Total': 0}
+
+def test_describe_columns():
+    stats = NumpyReportAccess().describe_columns(array('I', [1, 0, 1, 1]), array('q', [650, 95000, 350, 1000]), ['Home', 'Food'])
+    assert list(stats) == ['Food', 'Home']
+    assert stats['Food'] == {'count': 3, 'total': 20.0, 'mean': 20.0 / 3, 'min': 3.5, 'max': 10.0}
+    assert stats['Home'] == {'count': 1, 'total': 950.0, 'mean': 950.0, 'min': 950.0, 'max': 950.0}
+
+def test_reporting_manager_uses_columns(tmp_path):
+    transactions_access = TransactionsAccess(storage_file=str(tmp_path / 'storage.csv'))
+    classification_engine = ClassificationEngine(RuleAccess('examples/patterns.csv'))
+    reporting_manager = ReportingManager(transactions_access, classification_engine, NumpyReportAccess())
+    reporting_manager.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    report = reporting_manager.generate_report('2023-01-01', '2024-01-01')
+    assert report == ReportingManager(transactions_access, None, ReportAccess()).generate_report('2023-01-01', '2024-01-01')
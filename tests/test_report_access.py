@@ -3,7 +3,8 @@ import sys
 import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from report_access import ReportAccess
+from datetime import datetime
+from report_access import ReportAccess, period_windows
 
 def test_generate_report():
     transactions = [
@@ -21,4 +22,40 @@ def test_generate_report():
     assert report['Unclassified'] == 24.99
     assert report['Home'] == 1900.00
     assert report['Utilities'] == 472.50
-    assert report['Total'] == 2653.98
\ No newline at end of file
+    assert report['Total'] == 2653.98
+
+
+def test_generate_report_stream():
+    label_amounts = iter([('Food', 6.50), ('Home', 950.00), ('Food', 3.50), ('', 1.00)])
+    report = ReportAccess.generate_report_stream(label_amounts)
+    assert report == {'Food': 10.0, 'Home': 950.0, '': 1.0, 'Total': 961.0}
+
+def test_period_windows():
+    windows = period_windows(datetime(2023, 1, 30), datetime(2023, 3, 2), 'month')
+    assert windows == [
+        ('2023-01', datetime(2023, 1, 30), datetime(2023, 2, 1)),
+        ('2023-02', datetime(2023, 2, 1), datetime(2023, 3, 1)),
+        ('2023-03', datetime(2023, 3, 1), datetime(2023, 3, 3)),
+    ]
+    weeks = period_windows(datetime(2023, 1, 1), datetime(2023, 1, 9), 'week')
+    assert [(name, start.day) for name, start, _ in weeks] == [('2022-W52', 1), ('2023-W01', 2), ('2023-W02', 9)]
+    assert [name for name, _, _ in period_windows(datetime(2022, 12, 31), datetime(2024, 1, 1), 'year')] == ['2022', '2023', '2024']
+    assert len(period_windows(datetime(2024, 2, 1), datetime(2024, 2, 29), 'day')) == 29
+    with pytest.raises(ValueError):
+        period_windows(datetime(2023, 1, 1), datetime(2023, 1, 2), 'quarter')
+
+def test_generate_period_report():
+    dated_label_amounts = [
+        (datetime(2022, 12, 31), 'Food', 1.00),
+        (datetime(2023, 1, 1), 'Food', 6.50),
+        (datetime(2023, 1, 31), 'Home', 950.00),
+        (datetime(2023, 3, 1), 'Food', 3.50),
+        (datetime(2023, 1, 2), 'Food', 2.00),
+    ]
+    periods = period_windows(datetime(2023, 1, 1), datetime(2023, 3, 31), 'month')
+    report = ReportAccess().generate_period_report(dated_label_amounts, periods)
+    assert report == {
+        '2023-01': {'Food': 8.5, 'Home': 950.0, 'Total': 958.5},
+        '2023-02': {'Total': 0.0},
+        '2023-03': {'Food': 3.5, 'Total': 3.5},
+    }
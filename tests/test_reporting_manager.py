@@ -9,6 +9,7 @@ from classification_engine import ClassificationEngine
 from report_access import ReportAccess
 from rule_access import RuleAccess
 from reporting_manager import ReportingManager
+from transaction_output import CsvOutput
 
 @pytest.fixture
 def reporting_manager():
@@ -20,11 +21,72 @@ def reporting_manager():
     report_access = ReportAccess()
     yield ReportingManager(transactions_access, classification_engine, report_access)
     os.remove(tmp_name)
+    for sidecar in ('.hashes', '.labels'):
+        if os.path.exists(tmp_name + sidecar):
+            os.remove(tmp_name + sidecar)
 
 def test_import_transactions(reporting_manager):
     reporting_manager.import_transactions('examples/transactions.csv')
     assert len(reporting_manager.transactions_access.transactions) == 7
 
+def test_import_transactions_in_chunks(reporting_manager, tmp_path, capsys):
+    export = tmp_path / 'export.csv'
+    rows = open('examples/transactions.csv').read().splitlines()
+    export.write_text('\n'.join(rows[:4] + ['bad,Row,1.0'] + rows[4:]) + '\n')
+    with pytest.raises(ValueError):
+        reporting_manager.import_transactions(str(export), chunk_size=2)
+    assert len(reporting_manager.transactions_access.transactions) == 2
+    assert 'Import stopped after 2 transactions' in capsys.readouterr().out
+    # The checkpoint is kept with the store, not with the export
+    checkpoint_file = reporting_manager.transactions_access.import_checkpoint_file(str(export))
+    assert os.path.dirname(checkpoint_file) == os.path.dirname(reporting_manager.transactions_access.storage_file)
+    assert os.path.exists(checkpoint_file)
+    assert os.listdir(tmp_path) == ['export.csv']
+
+    export.write_text('\n'.join(rows) + '\n')
+    reporting_manager.import_transactions(str(export), chunk_size=2, resume=True)
+    assert [txn.description for txn in reporting_manager.transactions_access.transactions] == [txn.description for txn in TransactionsAccess(reporting_manager.transactions_access.storage_file).transactions]
+    assert len(reporting_manager.transactions_access.transactions) == 7
+    assert capsys.readouterr().out.splitlines()[-1] == 'Imported 5 transactions, skipped 0 already in the store.'
+    assert not os.path.exists(checkpoint_file)
+
+def test_import_skips_duplicates(reporting_manager, tmp_path, capsys):
+    transactions_access = reporting_manager.transactions_access
+    reporting_manager.import_transactions('examples/transactions.csv')
+    reporting_manager.import_transactions('examples/transactions.csv')
+    assert len(transactions_access.transactions) == 7
+    assert capsys.readouterr().out.splitlines()[-1] == 'Imported 0 transactions, skipped 7 already in the store.'
+
+    # An overlapping export: one coffee already stored, a second one on the same day is new
+    export = tmp_path / 'export.csv'
+    export.write_text("date,description,amount\n1/1/2023,Ted's coffee,6.5\n1/1/2023,Ted's coffee,6.5\n5/1/2024,Car repairs,2500\n6/1/2024,Rent,950\n")
+    reporting_manager.import_transactions(str(export), chunk_size=1)
+    assert capsys.readouterr().out.splitlines()[-1] == 'Imported 2 transactions, skipped 2 already in the store.'
+    assert [txn.description for txn in transactions_access.get_transactions('2023-01-01', '2023-01-01')].count("Ted's coffee") == 2
+
+    reporting_manager.import_transactions(str(export), skip_duplicates=False)
+    assert len(transactions_access.transactions) == 13
+
+def test_import_duplicate_index_is_rebuilt(reporting_manager):
+    transactions_access = reporting_manager.transactions_access
+    transactions_access.import_transactions('examples/transactions.csv')
+    assert not os.path.exists(transactions_access.storage_file + '.hashes')
+    transactions_access.get_duplicate_index()
+    assert transactions_access._checked_out == {}
+    reporting_manager.import_transactions('examples/transactions.csv')
+    assert len(transactions_access.transactions) == 7
+    assert len(transactions_access.get_duplicate_index()) == 7
+
+def test_resumed_import_counts_earlier_occurrences(reporting_manager, tmp_path):
+    export = tmp_path / 'export.csv'
+    rows = ['date,description,amount', '1/1/2023,Coffee,4.5', '2/1/2023,Tea,3.0', 'bad,Row,1.0', '1/1/2023,Coffee,4.5']
+    export.write_text('\n'.join(rows) + '\n')
+    with pytest.raises(ValueError):
+        reporting_manager.import_transactions(str(export), chunk_size=2)
+    export.write_text('\n'.join(rows[:3] + rows[4:]) + '\n')
+    reporting_manager.import_transactions(str(export), chunk_size=2, resume=True)
+    assert [txn.description for txn in reporting_manager.transactions_access.transactions] == ['Coffee', 'Tea', 'Coffee']
+
 def test_classify_transactions(reporting_manager):
     transactions_access = reporting_manager.transactions_access
     reporting_manager.import_transactions('examples/transactions.csv')
@@ -45,3 +107,72 @@ def test_generate_report(reporting_manager):
     assert 'Total' in report
     assert report['Food'] == 6.5
     assert report['Total'] == 2653.98  # Ensure the total matches expected value
+
+def test_classify_transactions_incremental(reporting_manager, tmp_path, capsys):
+    transactions_access = reporting_manager.transactions_access
+    reporting_manager.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    capsys.readouterr()
+
+    # Only the transaction that is still unclassified is retried
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01', incremental=True)
+    assert '1 transactions processed' in capsys.readouterr().out
+
+    # Transactions outside the last window have never been classified
+    reporting_manager.classify_transactions('2023-01-01', '2025-01-01', incremental=True)
+    assert '2 transactions processed' in capsys.readouterr().out
+
+    # A new rule set relabels everything
+    rules_file = tmp_path / 'rules.csv'
+    rules_file.write_text('pattern,label\nmaccas,Food\n')
+    reporting_manager.classification_engine.rule_access.load_rules(str(rules_file))
+    reporting_manager.classify_transactions('2023-01-01', '2025-01-01', incremental=True)
+    assert '7 transactions processed' in capsys.readouterr().out
+    assert len(transactions_access.get_transactions('2023-01-01', '2025-01-01', label='Food')) == 2
+
+def test_list_transactions_formats(reporting_manager, capsys):
+    reporting_manager.import_transactions('examples/transactions.csv')
+    capsys.readouterr()
+    reporting_manager.list_transactions('2023-01-01', '2023-01-31', output=CsvOutput())
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == ['date,description,amount,label', "2023-01-01,Ted's coffee,6.5,Unclassified", "2023-01-01,Moe's Shiny Shoes,249.99,Unclassified", '2023-01-10,Maccas,24.99,Unclassified']
+    # Counts go to stderr so that the output can be read by other programs
+    assert captured.err == '3 transactions listed\n'
+
+def test_classify_transactions_quiet(reporting_manager, capsys):
+    reporting_manager.import_transactions('examples/transactions.csv')
+    capsys.readouterr()
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01', quiet=True)
+    assert capsys.readouterr().out.splitlines()[0] == '6 transactions processed'
+    assert len(reporting_manager.transactions_access.get_transactions('2023-01-01', '2024-01-01', label='Unclassified')) == 1
+
+def test_generate_report_by_period(reporting_manager, capsys):
+    reporting_manager.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-12-31')
+    capsys.readouterr()
+    report = reporting_manager.generate_report('2023-01-01', '2024-12-31', group_by='year')
+    assert list(report) == ['2023', '2024']
+    assert report['2023'] == pytest.approx(reporting_manager.summarise('2023-01-01', '2023-12-31'))
+    assert '2024 Transport: 2500.00' in capsys.readouterr().out.splitlines()
+
+def test_summarise_periods(reporting_manager):
+    reporting_manager.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-12-31')
+    periods = [('2023-02-01', '2023-02-28'), ('2023-01-01', '2023-01-01'), ('2024-01-01', '2024-01-31')]
+    report = reporting_manager.summarise_periods(periods)
+    assert list(report) == ['2023-02-01 to 2023-02-28', '2023-01-01 to 2023-01-01', '2024-01-01 to 2024-01-31']
+    for (start_date, end_date), summary in zip(periods, report.values()):
+        expected = reporting_manager.summarise(start_date, end_date)
+        assert summary == pytest.approx(expected if len(expected) > 1 else {'Total': 0.0})
+    with pytest.raises(ValueError):
+        reporting_manager.summarise_periods([('2023-01-01', '2023-01-31'), ('2023-01-31', '2023-02-28')])
+
+def test_classify_transactions_cache_counts(reporting_manager, capsys):
+    reporting_manager.import_transactions('examples/transactions.csv')
+    capsys.readouterr()
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01', quiet=True)
+    assert capsys.readouterr().out.splitlines()[1] == '1 cached, 5 matched against rules'
+
+    reporting_manager.classification_engine.workers = 2
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01', quiet=True)
+    assert capsys.readouterr().out.splitlines() == ['6 transactions processed']
@@ -11,3 +11,11 @@ def test_load_rules():
     assert len(rules) == 6
     assert rules[0]['label'] == 'Food'
     assert rules[1]['pattern'].pattern == 'shoe'
+
+def test_fingerprint(tmp_path):
+    rule_access = RuleAccess('examples/patterns.csv')
+    assert rule_access.get_fingerprint() == RuleAccess('examples/patterns.csv').get_fingerprint()
+    rules_file = tmp_path / 'rules.csv'
+    rules_file.write_text('pattern,label\nmaccas,Food\n')
+    rule_access.load_rules(str(rules_file))
+    assert rule_access.get_fingerprint() != RuleAccess('examples/patterns.csv').get_fingerprint()
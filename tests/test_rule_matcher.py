@@ -0,0 +1,57 @@
+import pytest
+import sys
+import os
+import re
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from rule_matcher import CompiledRuleMatcher, literal_alternatives
+
+def make_rules(*rules):
+    return [{'pattern': re.compile(pattern), 'label': label} for pattern, label in rules]
+
+def sequential_match(rules, description):
+    for rule in rules:
+        if rule['pattern'].search(description):
+            return rule['label']
+    return None
+
+def test_literal_alternatives():
+    assert literal_alternatives('coffee|food|bistro') == ['coffee', 'food', 'bistro']
+    assert literal_alternatives(r"7\-eleven|moe's") == ['7-eleven', "moe's"]
+    assert literal_alternatives('rent$') is None
+    assert literal_alternatives(r'\bcar') is None
+    assert literal_alternatives('tax|') is None
+
+def test_first_rule_wins_over_leftmost_match():
+    rules = make_rules(('coffee', 'Food'), ('rent', 'Home'))
+    matcher = CompiledRuleMatcher(rules)
+    assert matcher.regex_rules == []
+    assert matcher.match('rent and coffee') == 'Food'
+    assert matcher.match('rent') == 'Home'
+    assert matcher.match('shoes') is None
+
+def test_overlapping_literals():
+    rules = make_rules(('shoes|hers', 'Clothing'), ('he', 'Pronoun'), ('she', 'Other'))
+    matcher = CompiledRuleMatcher(rules)
+    for description in ['ushers', 'she', 'he', 'shoe', 'hershey']:
+        assert matcher.match(description) == sequential_match(rules, description)
+
+def test_regex_rules_keep_their_order():
+    rules = make_rules(
+        (r'(\w)\1', 'Double'),
+        ('(?i)TAX', 'Government'),
+        ('shoe|boot', 'Clothing'),
+        ('^oo', 'Vowels'),
+        (r'car\b', 'Transport'),
+    )
+    matcher = CompiledRuleMatcher(rules)
+    assert [index for index, _ in matcher.regex_rules] == [0, 1, 3, 4]
+    for description in ['moe shoe', 'boat', 'tax office', 'car', 'cars', 'oops', 'fish']:
+        assert matcher.match(description) == sequential_match(rules, description)
+
+def test_matches_sequential_rules_on_examples():
+    with open('examples/patterns.csv', encoding='utf-8-sig') as file:
+        rules = make_rules(*(line.rstrip('\n').rsplit(',', 1) for line in list(file)[1:]))
+    matcher = CompiledRuleMatcher(rules)
+    for description in ["ted's coffee", "moe's shiny shoes", 'rent', 'power networks', 'car repairs', 'maccas', 'rental car coffee']:
+        assert matcher.match(description) == sequential_match(rules, description)
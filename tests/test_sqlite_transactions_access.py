@@ -0,0 +1,65 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sqlite_transactions_access import SqliteTransactionsAccess
+from reporting_manager import ReportingManager
+from report_access import ReportAccess
+from rule_access import RuleAccess
+from classification_engine import ClassificationEngine
+
+@pytest.fixture
+def transactions_access(tmp_path):
+    ta = SqliteTransactionsAccess(database_file=str(tmp_path / 'transactions.db'))
+    yield ta
+    ta.close()
+
+@pytest.fixture
+def reporting_manager(transactions_access):
+    classification_engine = ClassificationEngine(RuleAccess('examples/patterns.csv'))
+    return ReportingManager(transactions_access, classification_engine, ReportAccess())
+
+def test_import_transactions(transactions_access):
+    assert transactions_access.import_transactions('examples/transactions.csv') == 7
+    transactions = transactions_access.get_transactions('2023-01-01', '2024-12-31')
+    assert len(transactions) == 7
+    assert transactions[0]['description'] == "Ted's coffee"
+    assert transactions[0]['amount'] == 6.5
+    assert len(transactions_access.get_transactions('2023-01-01', '2024-01-01')) == 6
+    assert len(transactions_access.get_transactions('2023-02-03', '2023-02-03')) == 2
+
+def test_classify_and_reopen(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    assert len(transactions_access.get_transactions('2023-01-01', '2024-01-01', label='Home')) == 2
+
+    new_access = SqliteTransactionsAccess(database_file=transactions_access.database_file)
+    home = new_access.get_transactions('2023-01-01', '2024-12-31', label='Home')
+    assert [(txn['description'], txn['amount']) for txn in home] == [('Rent', 950.0), ('Rent', 950.0)]
+    assert new_access.get_transactions('2024-01-05', '2024-01-05')[0]['label'] == 'Unclassified'
+    new_access.close()
+
+def test_save_updates_only_changed_rows(transactions_access):
+    transactions_access.import_transactions('examples/transactions.csv')
+    transactions = transactions_access.get_transactions('2023-01-01', '2024-12-31')
+    transactions[3]['label'] = 'Home'
+    changes = transactions_access.connection.total_changes
+    transactions_access.save_transactions()
+    assert transactions_access.connection.total_changes - changes == 1
+
+def test_generate_report(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    report = reporting_manager.generate_report('2023-01-01', '2024-01-01')
+    assert list(report.items()) == [('Food', 6.5), ('Clothing', 249.99), ('Unclassified', 24.99), ('Home', 1900.0), ('Utilities', 472.5), ('Total', 2653.98)]
+
+def test_generate_report_by_month(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    report = reporting_manager.generate_report('2023-01-01', '2023-03-31', group_by='month')
+    assert report == {
+        '2023-01': {'Food': 6.5, 'Clothing': 249.99, 'Unclassified': 24.99, 'Total': 281.48},
+        '2023-02': {'Home': 1900.0, 'Utilities': 472.5, 'Total': 2372.5},
+        '2023-03': {'Total': 0.0},
+    }
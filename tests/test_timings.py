@@ -0,0 +1,67 @@
+import pytest
+import sys
+import os
+import json
+from tempfile import NamedTemporaryFile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import timings
+from timings import stage, start_timings, stop_timings
+from transactions_access import TransactionsAccess
+from classification_engine import ClassificationEngine
+from report_access import ReportAccess
+from rule_access import RuleAccess
+from reporting_manager import ReportingManager
+
+@pytest.fixture
+def reporting_manager():
+    with NamedTemporaryFile(delete=False) as tmp:
+        tmp_name = tmp.name
+    transactions_access = TransactionsAccess(storage_file=tmp_name)
+    classification_engine = ClassificationEngine(RuleAccess('examples/patterns.csv'))
+    yield ReportingManager(transactions_access, classification_engine, ReportAccess())
+    stop_timings()
+    os.remove(tmp_name)
+    for sidecar in ('.hashes', '.labels'):
+        if os.path.exists(tmp_name + sidecar):
+            os.remove(tmp_name + sidecar)
+
+def test_stage_adds_up_runs():
+    start_timings('test')
+    for rows in (3, 4):
+        with stage('parse') as timed:
+            timed.rows = rows
+    record = stop_timings()
+    assert record.stages['parse'].rows == 7
+    assert record.stages['parse'].calls == 2
+    assert record.stages['parse'].seconds >= 0
+
+def test_stage_without_timings():
+    with stage('parse') as timed:
+        timed.rows = 3
+    assert timings._active is None
+
+def test_stage_counts_failed_run():
+    start_timings('test')
+    with pytest.raises(ValueError):
+        with stage('parse'):
+            raise ValueError('bad row')
+    assert stop_timings().stages['parse'].calls == 1
+
+def test_timings_json():
+    start_timings('report')
+    with stage('report') as timed:
+        timed.rows = 2
+    record = json.loads(stop_timings().to_json())
+    assert record['command'] == 'report'
+    assert [(item['name'], item['rows']) for item in record['stages']] == [('report', 2)]
+    if sys.platform != 'win32':
+        assert record['max_rss_bytes'] > 0
+
+def test_command_stages(reporting_manager):
+    reporting_manager.import_transactions('examples/transactions.csv')
+    start_timings('classify')
+    reporting_manager.classify_transactions('2023-01-01', '2023-12-31')
+    record = stop_timings()
+    assert list(record.stages) == ['query', 'classify', 'save', 'output']
+    assert record.stages['classify'].rows == 6
@@ -0,0 +1,41 @@
+import pytest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from transaction import Transaction
+
+@pytest.fixture
+def transaction():
+    return Transaction(datetime(2023, 1, 1), "Ted's coffee", 6.5)
+
+def test_slots(transaction):
+    assert not hasattr(transaction, '__dict__')
+    with pytest.raises(AttributeError):
+        transaction.category = 'Food'
+
+def test_dict_view(transaction):
+    assert transaction['description'] == "Ted's coffee"
+    assert transaction.get('label', 'Food') == 'Unclassified'
+    assert transaction.get('category') is None
+    transaction['label'] = 'Food'
+    assert transaction.label == 'Food'
+    assert dict(transaction) == {'date': datetime(2023, 1, 1), 'description': "Ted's coffee", 'amount': 6.5, 'label': 'Food', 'rule_version': ''}
+    assert transaction == dict(transaction)
+    with pytest.raises(KeyError):
+        transaction['category'] = 'Food'
+    with pytest.raises(KeyError):
+        transaction['__class__']
+
+def test_copy(transaction):
+    copy = transaction.copy()
+    copy['label'] = 'Food'
+    assert transaction.label == 'Unclassified'
+    assert copy == Transaction(datetime(2023, 1, 1), "Ted's coffee", 6.5, 'Food')
+
+def test_interned_labels():
+    labels = ''.join(['Fo', 'od']), ''.join(['F', 'ood'])
+    assert labels[0] is not labels[1]
+    first, second = (Transaction(datetime(2023, 1, 1), 'Coffee', 1.0, label) for label in labels)
+    assert first.label is second.label
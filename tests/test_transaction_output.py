@@ -0,0 +1,55 @@
+import pytest
+import sys
+import os
+import io
+import csv
+import json
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import transaction_output
+from transaction import Transaction
+from transaction_output import CsvOutput, JsonlOutput, TableOutput, create_output
+
+@pytest.fixture
+def transactions():
+    return [
+        Transaction(datetime(2023, 1, 1), "Ted's coffee", 6.5, 'Food'),
+        Transaction(datetime(2023, 1, 2), 'Rent, January', 950.0),
+    ]
+
+def test_table_output(transactions):
+    stream = io.StringIO()
+    assert TableOutput(stream).write(transactions) == 2
+    assert stream.getvalue() == "2023-01-01 Ted's coffee: 6.5 [Food]\n2023-01-02 Rent, January: 950.0 [Unclassified]\n"
+
+def test_table_output_classified(transactions):
+    stream = io.StringIO()
+    TableOutput(stream, classified=True).write(transactions)
+    assert stream.getvalue() == "2023-01-01 Ted's coffee: 6.5 classified as Food\n2023-01-02 Rent, January: 950.0 unable to classify\n"
+
+def test_csv_output(transactions):
+    stream = io.StringIO()
+    CsvOutput(stream).write(transactions)
+    rows = list(csv.reader(io.StringIO(stream.getvalue())))
+    assert rows == [['date', 'description', 'amount', 'label'], ['2023-01-01', "Ted's coffee", '6.5', 'Food'], ['2023-01-02', 'Rent, January', '950.0', 'Unclassified']]
+
+def test_jsonl_output(transactions):
+    stream = io.StringIO()
+    JsonlOutput(stream).write(transactions)
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[1] == {'date': '2023-01-02', 'description': 'Rent, January', 'amount': 950.0, 'label': 'Unclassified'}
+
+def test_output_batches(transactions, monkeypatch):
+    monkeypatch.setattr(transaction_output, 'OUTPUT_BATCH_SIZE', 1)
+    stream = io.StringIO()
+    writes = []
+    stream.write = lambda text: writes.append(text)
+    assert JsonlOutput(stream).write(iter(transactions * 3)) == 6
+    # The header, then one write per batch
+    assert len(writes) == 7
+
+def test_create_output():
+    assert isinstance(create_output('csv'), CsvOutput)
+    with pytest.raises(ValueError):
+        create_output('xml')
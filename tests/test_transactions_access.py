@@ -1,15 +1,18 @@
 import pytest
 import sys
 import os
-from datetime import datetime
+import csv
+import time
+from datetime import datetime, timedelta
 from tempfile import NamedTemporaryFile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from transactions_access import TransactionsAccess
+from transactions_access import DateParser, DuplicateIndex, ImportCheckpoint, StreamingTransactionsAccess, TransactionsAccess, label_log_file, parse_cents, read_label_log, read_storage_file, read_transaction_chunks, read_transactions_file
 from reporting_manager import ReportingManager
 from report_access import ReportAccess
 from rule_access import RuleAccess
 from classification_engine import ClassificationEngine
+from transaction import Transaction
 
 @pytest.fixture
 def transactions_access():
@@ -18,6 +21,9 @@ def transactions_access():
     ta = TransactionsAccess(storage_file=tmp_name)
     yield ta
     os.remove(tmp_name)
+    for sidecar in ('.hashes', '.labels'):
+        if os.path.exists(tmp_name + sidecar):
+            os.remove(tmp_name + sidecar)
 
 @pytest.fixture
 def reporting_manager(transactions_access):
@@ -62,3 +68,346 @@ def test_save_and_load_transactions(transactions_access):
     new_access = TransactionsAccess(storage_file=transactions_access.storage_file)
     assert len(new_access.transactions) == 7
     assert new_access.transactions[0]['description'] == "Ted's coffee"
+
+def test_get_transactions_date_range_boundaries(transactions_access):
+    transactions_access.import_transactions('examples/transactions.csv')
+    transactions = transactions_access.get_transactions('2023-01-01', '2023-02-03')
+    assert [txn['description'] for txn in transactions] == ["Ted's coffee", "Moe's Shiny Shoes", 'Maccas', 'Rent', 'Power networks']
+    assert transactions_access.get_transactions('2023-01-02', '2023-01-09') == []
+
+def test_get_transactions_label_index_follows_relabelling(transactions_access):
+    transactions_access.import_transactions('examples/transactions.csv')
+    rent = transactions_access.get_transactions('2023-02-03', '2023-02-03')
+    for txn in rent:
+        txn['label'] = 'Home'
+    home = transactions_access.get_transactions('2023-01-01', '2024-01-01', label='Home')
+    assert [txn['description'] for txn in home] == ['Rent', 'Power networks']
+    assert len(transactions_access.get_transactions('2023-01-01', '2024-01-01', label='Unclassified')) == 4
+
+def test_rule_version_is_persisted(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    assert transactions_access.transactions[0]['rule_version'] == ''
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    new_access = TransactionsAccess(storage_file=transactions_access.storage_file)
+    rule_version = reporting_manager.classification_engine.rule_access.get_fingerprint()
+    assert [txn['rule_version'] for txn in new_access.transactions] == [rule_version] * 6 + ['']
+
+def write_transactions_file(path, rows, start=datetime(2020, 1, 1)):
+    with open(path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['date', 'description', 'amount'])
+        for i in range(rows):
+            day = start + timedelta(days=i // 10)
+            writer.writerow([f'{day.day}/{day.month}/{day.year}', f'Shop {i % 50}', '12.34'])
+
+def test_indexes_follow_large_batches(transactions_access, tmp_path):
+    # Batches this large are merged into the indexes rather than inserted one at a time
+    write_transactions_file(tmp_path / 'new.csv', 300, start=datetime(2023, 1, 1))
+    write_transactions_file(tmp_path / 'old.csv', 300, start=datetime(2022, 12, 20))
+    transactions_access.import_transactions(str(tmp_path / 'new.csv'))
+    transactions_access.import_transactions(str(tmp_path / 'old.csv'))
+    for i, txn in enumerate(transactions_access.get_transactions('2022-12-25', '2023-01-20')):
+        txn['label'] = 'Food' if i % 2 else 'Home'
+
+    transactions = transactions_access.transactions
+    for label in (None, 'Food', 'Home', 'Unclassified'):
+        expected = sorted((position for position, txn in enumerate(transactions) if not label or txn['label'] == label), key=lambda position: transactions[position]['date'])
+        found = transactions_access.get_transactions('2022-01-01', '2024-01-01', label)
+        assert [id(txn) for txn in found] == [id(transactions[position]) for position in expected]
+
+def test_import_appends_to_storage(transactions_access, tmp_path):
+    transactions_access.import_transactions('examples/transactions.csv')
+    write_transactions_file(tmp_path / 'more.csv', 3, start=datetime(2024, 2, 1))
+    assert transactions_access.import_transactions(str(tmp_path / 'more.csv')) == 3
+    new_access = TransactionsAccess(storage_file=transactions_access.storage_file)
+    assert [txn['description'] for txn in new_access.transactions] == [txn['description'] for txn in transactions_access.transactions]
+    assert len(new_access.get_transactions('2024-02-01', '2024-02-01')) == 3
+
+def test_import_rewrites_storage_with_old_columns(tmp_path):
+    storage_file = tmp_path / 'storage.csv'
+    storage_file.write_text('date,description,amount,label\n2023-01-01,Rent,950.0,Home\n')
+    transactions_access = TransactionsAccess(storage_file=str(storage_file))
+    transactions_access.import_transactions('examples/transactions.csv')
+    with open(storage_file, newline='') as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 8
+    assert rows[0] == {'date': '2023-01-01', 'description': 'Rent', 'amount': '950.0', 'label': 'Home', 'rule_version': ''}
+
+def test_import_drops_extra_columns(transactions_access, tmp_path):
+    (tmp_path / 'export.csv').write_text('date,description,amount,balance\n01/01/2023,Rent,-950.0,50.0\n')
+    transactions_access.import_transactions(str(tmp_path / 'export.csv'))
+    new_access = TransactionsAccess(storage_file=transactions_access.storage_file)
+    assert dict(new_access.transactions[0]) == {'date': datetime(2023, 1, 1), 'description': 'Rent', 'amount': -950.0, 'label': 'Unclassified', 'rule_version': ''}
+
+def test_import_time_does_not_grow_with_store(tmp_path):
+    daily_file = tmp_path / 'daily.csv'
+    write_transactions_file(daily_file, 100, start=datetime(2030, 1, 1))
+
+    def import_time(store_rows):
+        write_transactions_file(tmp_path / 'history.csv', store_rows)
+        best = float('inf')
+        for attempt in range(3):
+            storage_file = str(tmp_path / f'storage_{store_rows}_{attempt}.csv')
+            transactions_access = TransactionsAccess(storage_file=storage_file)
+            transactions_access.import_transactions(str(tmp_path / 'history.csv'))
+            start = time.perf_counter()
+            transactions_access.import_transactions(str(daily_file))
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    small = import_time(100)
+    large = import_time(20_000)
+    # A full rewrite of the larger store takes hundreds of times longer
+    assert large < 10 * max(small, 0.001)
+
+def test_iter_label_amounts(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    label_amounts = list(transactions_access.iter_label_amounts('2023-02-01', '2024-01-01'))
+    assert label_amounts == [('Home', 950.0), ('Utilities', 472.5), ('Home', 950.0)]
+
+def test_streaming_transactions_access(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    streaming_access = StreamingTransactionsAccess(transactions_access.storage_file)
+    assert list(streaming_access.iter_label_amounts('2023-01-01', '2024-01-01')) == list(transactions_access.iter_label_amounts('2023-01-01', '2024-01-01'))
+    assert streaming_access.get_transactions('2023-01-01', '2024-01-01', label='Home') == transactions_access.get_transactions('2023-01-01', '2024-01-01', label='Home')
+    report = ReportingManager(streaming_access, None, ReportAccess()).generate_report('2023-01-01', '2024-01-01')
+    assert report['Total'] == 2653.98
+
+def test_streaming_transactions_access_never_lists_transactions(transactions_access, reporting_manager, monkeypatch):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    expected = ReportingManager(transactions_access, None, ReportAccess()).generate_report('2023-01-01', '2024-01-01', group_by='month')
+    streaming_access = StreamingTransactionsAccess(transactions_access.storage_file)
+
+    def get_transactions(*args, **kwargs):
+        raise AssertionError('the whole window was read into a list')
+
+    monkeypatch.setattr(streaming_access, 'get_transactions', get_transactions)
+    streaming_manager = ReportingManager(streaming_access, None, ReportAccess())
+    assert streaming_manager.generate_report('2023-01-01', '2024-01-01', group_by='month') == expected
+    assert streaming_manager.generate_report('2023-01-01', '2024-01-01')['Total'] == 2653.98
+    assert len(list(streaming_access.iter_transactions('2023-01-01', '2024-01-01', label='Home'))) == 2
+
+def test_streaming_transactions_access_is_read_only(transactions_access):
+    transactions_access.import_transactions('examples/transactions.csv')
+    streaming_access = StreamingTransactionsAccess(transactions_access.storage_file)
+    with pytest.raises(PermissionError):
+        streaming_access.import_transactions('examples/transactions.csv')
+    with pytest.raises(PermissionError):
+        streaming_access.append_transactions(transactions_access.transactions)
+    assert len(TransactionsAccess(transactions_access.storage_file).transactions) == 7
+
+def test_iter_label_totals_match_transactions(transactions_access, reporting_manager, tmp_path):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2023-02-10')
+    # An import dated before existing days, and a relabelling of an old transaction
+    write_transactions_file(tmp_path / 'old.csv', 20, start=datetime(2022, 12, 30))
+    transactions_access.import_transactions(str(tmp_path / 'old.csv'))
+    transactions_access.get_transactions('2023-01-10', '2023-01-10')[0]['label'] = 'Food'
+
+    for start_date, end_date in [('2022-01-01', '2025-01-01'), ('2023-01-01', '2023-01-01'), ('2023-01-02', '2023-02-03'), ('2024-02-01', '2024-03-01')]:
+        expected = ReportAccess.generate_report(transactions_access.get_transactions(start_date, end_date))
+        report = ReportAccess.generate_report_stream(transactions_access.iter_label_totals(start_date, end_date))
+        assert report == pytest.approx(expected)
+        assert list(report) == list(expected)
+
+def test_iter_label_totals_after_reload(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    new_access = TransactionsAccess(storage_file=transactions_access.storage_file)
+    assert list(new_access.iter_label_totals('2023-01-01', '2024-01-01')) == [('Food', 6.5), ('Clothing', 249.99), ('Unclassified', 24.99), ('Home', 1900.0), ('Utilities', 472.5)]
+
+def test_date_parser():
+    parse_date = DateParser(['%d/%m/%Y', '%Y-%m-%d'])
+    assert parse_date('2023-02-01') == datetime(2023, 2, 1)
+    assert parse_date.formats[0] == '%Y-%m-%d'
+    assert parse_date('1/2/2023') == datetime(2023, 2, 1)
+    assert parse_date('2023-02-01') is parse_date('2023-02-01')
+    for text in ['31/02/2023', '01/02/23', '2023/02/01', '01-02-2023', ' 1/2/2023', '']:
+        with pytest.raises(ValueError, match=f"Date {text} does not match any known formats"):
+            parse_date(text)
+
+def test_parse_cents():
+    assert [parse_cents(text) for text in ['950', '-950.0', '0.1', '0.29', '1.005', '12345678.99']] == [95000, -95000, 10, 29, 100, 1234567899]
+    for text in ['ten', 'inf', '-Infinity', 'nan', '1e400']:
+        with pytest.raises(ValueError):
+            parse_cents(text)
+
+def test_read_transactions_file_rejects_infinite_amounts(tmp_path):
+    (tmp_path / 'export.csv').write_text('date,description,amount\n01/01/2023,Rent,-950.0\n02/01/2023,Coffee,inf\n')
+    with pytest.raises(ValueError, match='Amount inf is not a finite number'):
+        read_transactions_file(str(tmp_path / 'export.csv'))
+
+def test_read_transactions_file_rejects_bad_dates(tmp_path):
+    (tmp_path / 'export.csv').write_text('date,description,amount\n01/01/2023,Rent,-950.0\n2023-01-02,Coffee,-4.5\n')
+    with pytest.raises(ValueError, match='Date 2023-01-02 does not match any known formats'):
+        read_transactions_file(str(tmp_path / 'export.csv'))
+
+def test_read_storage_file_mixed_formats(tmp_path):
+    storage_file = tmp_path / 'storage.csv'
+    storage_file.write_text('date,description,amount,label\n01/02/2023,Rent,950.0,Home\n\n2023-02-02,Coffee,4.5\n')
+    transactions = list(read_storage_file(str(storage_file)))
+    assert [(txn.date, txn.label, txn.rule_version) for txn in transactions] == [(datetime(2023, 2, 1), 'Home', ''), (datetime(2023, 2, 2), '', '')]
+
+def test_read_transaction_chunks(tmp_path):
+    write_transactions_file(tmp_path / 'export.csv', 5)
+    chunks = list(read_transaction_chunks(str(tmp_path / 'export.csv'), 2))
+    assert [len(chunk) for chunk, _ in chunks] == [2, 2, 1]
+    assert chunks[-1][1] == os.path.getsize(tmp_path / 'export.csv')
+    resumed = list(read_transaction_chunks(str(tmp_path / 'export.csv'), 2, chunks[0][1]))
+    assert [txn.description for chunk, _ in resumed for txn in chunk] == [txn.description for chunk, _ in chunks[1:] for txn in chunk]
+
+def test_import_checkpoint(tmp_path):
+    export = tmp_path / 'export.csv'
+    write_transactions_file(export, 5)
+    offset = next(read_transaction_chunks(str(export), 2))[1]
+    ImportCheckpoint(str(export)).save(offset, 2)
+    checkpoint = ImportCheckpoint(str(export))
+    assert checkpoint.load() and (checkpoint.offset, checkpoint.rows) == (offset, 2)
+
+    # Rows after the checkpoint may change, rows before it may not
+    with open(export, 'a') as file:
+        file.write('01/01/2021,Extra,1.0\n')
+    assert ImportCheckpoint(str(export)).load()
+    export.write_text(export.read_text().replace('\n', '\n ', 1))
+    with pytest.raises(ValueError, match='no longer matches'):
+        ImportCheckpoint(str(export)).load()
+    checkpoint.clear()
+    assert not ImportCheckpoint(str(export)).load()
+
+def test_iter_dated_label_totals_match_transactions(transactions_access, reporting_manager, tmp_path):
+    transactions_access.import_transactions('examples/transactions.csv')
+    reporting_manager.classify_transactions('2023-01-01', '2024-01-01')
+    write_transactions_file(tmp_path / 'old.csv', 20, start=datetime(2022, 12, 30))
+    transactions_access.import_transactions(str(tmp_path / 'old.csv'))
+    transactions_access.get_transactions('2023-01-10', '2023-01-10')[0]['label'] = 'Food'
+
+    daily_totals = {}
+    for txn in transactions_access.get_transactions('2023-01-01', '2023-02-28'):
+        key = (txn.date, txn.label)
+        daily_totals[key] = daily_totals.get(key, 0.0) + txn.amount
+    triples = list(transactions_access.iter_dated_label_totals('2023-01-01', '2023-02-28'))
+    assert {(date, label): amount for date, label, amount in triples} == pytest.approx(daily_totals)
+    assert [date for date, _, _ in triples] == sorted(date for date, _, _ in triples)
+
+def test_save_logs_only_changed_rows(transactions_access):
+    transactions_access.import_transactions('examples/transactions.csv')
+    with open(transactions_access.storage_file) as file:
+        stored = file.read()
+    rent = transactions_access.get_transactions('2023-02-03', '2023-02-03')[0]
+    rent['label'] = 'Home'
+    transactions_access.get_transactions('2023-01-10', '2023-01-10')[0]['rule_version'] = 'v2'
+    transactions_access.save_transactions()
+
+    # The storage file is left alone and the log holds the two changed rows
+    with open(transactions_access.storage_file) as file:
+        assert file.read() == stored
+    log_file = label_log_file(transactions_access.storage_file)
+    assert read_label_log(log_file) == [(2, 'Unclassified', 'v2'), (3, 'Home', '')]
+    new_access = TransactionsAccess(storage_file=transactions_access.storage_file)
+    assert [txn['description'] for txn in new_access.get_transactions('2023-01-01', '2024-01-01', label='Home')] == ['Rent']
+    assert new_access.transactions[2]['rule_version'] == 'v2'
+    streaming_access = StreamingTransactionsAccess(transactions_access.storage_file)
+    assert streaming_access.get_transactions('2023-01-01', '2024-01-01', label='Home') == [rent]
+
+    # Saving again without changes writes nothing
+    transactions_access.get_transactions('2023-01-01', '2024-01-01')
+    transactions_access.save_transactions()
+    assert len(read_label_log(log_file)) == 2
+
+def test_compact(transactions_access):
+    transactions_access.import_transactions('examples/transactions.csv')
+    transactions_access.get_transactions('2023-02-03', '2023-02-03')[0]['label'] = 'Home'
+    transactions_access.save_transactions()
+    log_file = label_log_file(transactions_access.storage_file)
+    with open(log_file, mode='a') as file:
+        # An entry cut short by a crash is ignored
+        file.write('4,Uti')
+    transactions_access.compact()
+    assert not os.path.exists(log_file)
+    new_access = TransactionsAccess(storage_file=transactions_access.storage_file)
+    assert [txn['label'] for txn in new_access.transactions] == ['Unclassified'] * 3 + ['Home'] + ['Unclassified'] * 3
+
+def test_save_after_torn_log_entry(transactions_access):
+    transactions_access.import_transactions('examples/transactions.csv')
+    transactions_access.get_transactions('2023-02-03', '2023-02-03')[0]['label'] = 'Home'
+    transactions_access.save_transactions()
+    log_file = label_log_file(transactions_access.storage_file)
+    with open(log_file, mode='a') as file:
+        file.write('4,Uti')
+    transactions_access.get_transactions('2023-01-01', '2023-01-01')[0]['label'] = 'Food'
+    transactions_access.save_transactions()
+
+    assert read_label_log(log_file) == [(3, 'Home', ''), (0, 'Food', '')]
+    new_access = TransactionsAccess(storage_file=transactions_access.storage_file)
+    assert [txn['label'] for txn in new_access.transactions] == ['Food'] + ['Unclassified'] * 2 + ['Home'] + ['Unclassified'] * 3
+
+def test_save_compacts_large_log(transactions_access, reporting_manager):
+    transactions_access.import_transactions('examples/transactions.csv')
+    # Relabelling every row costs as much as rewriting the store, so it is rewritten
+    reporting_manager.classify_transactions('2023-01-01', '2024-12-31')
+    assert not os.path.exists(label_log_file(transactions_access.storage_file))
+    assert TransactionsAccess(storage_file=transactions_access.storage_file).transactions == transactions_access.transactions
+
+def test_duplicate_index(tmp_path):
+    index_file = str(tmp_path / 'hashes')
+    transactions = read_transactions_file('examples/transactions.csv')
+    duplicate_index = DuplicateIndex(index_file)
+    duplicate_index.add(transactions[:3])
+    duplicate_index.close()
+
+    duplicate_index = DuplicateIndex(index_file)
+    assert len(duplicate_index) == 3
+    unmatched = {}
+    assert duplicate_index.filter_new(transactions, unmatched) == transactions[3:]
+    # Only keys the store held are tracked
+    assert len(unmatched) == 3
+    duplicate_index.add(transactions[3:])
+    # Transactions added since the index was opened are not taken for stored ones
+    assert duplicate_index.filter_new(transactions[3:], unmatched) == transactions[3:]
+    duplicate_index.close()
+    assert DuplicateIndex(index_file).filter_new(transactions, {}) == []
+
+def test_duplicate_index_grows(tmp_path):
+    index_file = str(tmp_path / 'hashes')
+    transactions = [Transaction(datetime(2023, 1, 1) + timedelta(days=day % 400), 'Coffee', day % 7) for day in range(5000)]
+    duplicate_index = DuplicateIndex(index_file)
+    for start in range(0, len(transactions), 1000):
+        duplicate_index.add(transactions[start:start + 1000])
+    duplicate_index.close()
+    duplicate_index = DuplicateIndex(index_file)
+    assert len(duplicate_index) == 5000
+    assert duplicate_index.filter_new(transactions + transactions[:10], {}) == transactions[:10]
+    assert not os.path.exists(index_file + '.tmp')
+
+def test_duplicate_index_replaces_other_files(tmp_path):
+    index_file = tmp_path / 'hashes'
+    index_file.write_bytes(bytes(24))
+    duplicate_index = DuplicateIndex(str(index_file))
+    assert len(duplicate_index) == 0
+    duplicate_index.add(read_transactions_file('examples/transactions.csv'))
+    assert len(DuplicateIndex(str(index_file))) == 7
+
+def test_duplicate_index_check_time_does_not_grow_with_store(tmp_path):
+    daily = [Transaction(datetime(2030, 1, 1), f'Daily {row}', 1.0) for row in range(100)]
+
+    def check_time(store_rows):
+        index_file = str(tmp_path / f'hashes_{store_rows}')
+        duplicate_index = DuplicateIndex(index_file)
+        duplicate_index.add(Transaction(datetime(2023, 1, 1), f'Stored {row}', 1.0) for row in range(store_rows))
+        duplicate_index.close()
+        best = float('inf')
+        for attempt in range(3):
+            start = time.perf_counter()
+            duplicate_index = DuplicateIndex(index_file)
+            assert duplicate_index.filter_new(daily, {}) == daily
+            duplicate_index.close()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    small = check_time(100)
+    large = check_time(100_000)
+    # Reading every stored key takes hundreds of times longer
+    assert large < 10 * max(small, 0.001)
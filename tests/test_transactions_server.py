@@ -0,0 +1,100 @@
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from transactions_access import TransactionsAccess
+from classification_engine import ClassificationEngine
+from report_access import ReportAccess
+from rule_access import RuleAccess
+from reporting_manager import ReportingManager
+from transactions_server import ReadWriteLock, TransactionsHTTPServer
+
+@pytest.fixture
+def server(tmp_path):
+    transactions_access = TransactionsAccess(storage_file=str(tmp_path / 'storage.csv'))
+    transactions_access.import_transactions('examples/transactions.csv')
+    classification_engine = ClassificationEngine(RuleAccess('examples/patterns.csv'))
+    reporting_manager = ReportingManager(transactions_access, classification_engine, ReportAccess())
+    server = TransactionsHTTPServer(('127.0.0.1', 0), reporting_manager)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def request(server, path, method='GET'):
+    with urlopen(Request(f'http://127.0.0.1:{server.server_address[1]}{path}', method=method)) as response:
+        return json.loads(response.read())
+
+def test_report_and_classify(server):
+    assert request(server, '/report?start_date=2023-01-01&end_date=2024-12-31') == {'Unclassified': 5153.98, 'Total': 5153.98}
+    assert request(server, '/classify?start_date=2023-01-01&end_date=2024-12-31', 'POST') == {'processed': 7, 'classified': 6, 'unclassified': 1}
+    assert request(server, '/classify?start_date=2023-01-01&end_date=2024-12-31&incremental=1', 'POST')['processed'] == 1
+    report = request(server, '/report?start_date=2023-01-01&end_date=2024-12-31')
+    assert report['Home'] == 1900.0 and report['Total'] == 5153.98
+    assert TransactionsAccess(server.reporting_manager.transactions_access.storage_file).label_index['Home'].positions
+
+def test_report_by_month(server):
+    report = request(server, '/report?start_date=2023-01-01&end_date=2023-02-28&group_by=month')
+    assert report == {'2023-01': {'Unclassified': 281.48, 'Total': 281.48}, '2023-02': {'Unclassified': 2372.5, 'Total': 2372.5}}
+
+def test_list(server):
+    request(server, '/classify?start_date=2023-01-01&end_date=2024-12-31', 'POST')
+    transactions = request(server, '/list?start_date=2023-01-01&end_date=2023-12-31&label=Home')['transactions']
+    assert transactions == [
+        {'date': '2023-02-03', 'description': 'Rent', 'amount': 950.0, 'label': 'Home'},
+        {'date': '2023-02-17', 'description': 'Rent', 'amount': 950.0, 'label': 'Home'},
+    ]
+    assert len(request(server, '/list?start_date=2023-01-01&end_date=2024-12-31')['transactions']) == 7
+
+def test_bad_requests(server):
+    for path, status in [('/report', 400), ('/report?start_date=2023-13-01', 400), ('/report?start_date=2023-01-01&group_by=quarter', 400), ('/nothing', 404)]:
+        with pytest.raises(HTTPError) as error:
+            request(server, path)
+        assert error.value.code == status
+        assert 'error' in json.loads(error.value.read())
+
+def test_concurrent_reads_and_classification(server):
+    errors = []
+
+    def read():
+        try:
+            for _ in range(20):
+                assert request(server, '/report?start_date=2023-01-01&end_date=2024-12-31')['Total'] == 5153.98
+                assert len(request(server, '/list?start_date=2023-01-01&end_date=2024-12-31')['transactions']) == 7
+        except Exception as error:
+            errors.append(error)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for _ in range(5):
+        request(server, '/classify?start_date=2023-01-01&end_date=2024-12-31', 'POST')
+    for reader in readers:
+        reader.join()
+    assert not errors
+
+def test_read_write_lock():
+    lock = ReadWriteLock()
+    events = []
+
+    def write():
+        with lock.write():
+            events.append('write')
+
+    with lock.read():
+        with lock.read():
+            writer = threading.Thread(target=write)
+            writer.start()
+            time.sleep(0.05)
+            # Readers hold the lock, so the writer waits
+            assert events == []
+    writer.join()
+    assert events == ['write']
@@ -0,0 +1,138 @@
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then left out
+    resource = None
+
+class Stage:
+    __slots__ = ('name', 'seconds', 'rows', 'calls', 'max_rss')
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize the totals of a named stage of a command.
+
+        Args:
+            name (str): Name of the stage.
+        """
+        self.name = name
+        self.seconds = 0.0
+        self.rows = 0
+        self.calls = 0
+        self.max_rss: Optional[int] = None
+
+class Timings:
+    def __init__(self, command: str) -> None:
+        """
+        Initialize the record of where the time of a command goes.
+
+        Stages with the same name, such as the chunks of an import, add up. The
+        peak resident memory of the process is read after every stage.
+
+        Args:
+            command (str): Name of the command being timed.
+        """
+        self.command = command
+        self.stages: dict[str, Stage] = {}
+        self.start = time.perf_counter()
+
+    def to_dict(self) -> dict[str, any]:
+        """
+        Get the timings as a JSON-serialisable dictionary.
+
+        Returns:
+            Dict[str, Any]: Command, total wall time, peak memory and stages in the order they first ran.
+        """
+        return {
+            'command': self.command,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'seconds': time.perf_counter() - self.start,
+            'max_rss_bytes': max_rss(),
+            'stages': [
+                {'name': stage.name, 'seconds': stage.seconds, 'rows': stage.rows, 'calls': stage.calls, 'max_rss_bytes': stage.max_rss}
+                for stage in self.stages.values()
+            ],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+# Timings being recorded, if any; set by start_timings
+_active: Optional[Timings] = None
+
+def max_rss() -> Optional[int]:
+    """
+    Get the peak resident memory of the process so far.
+
+    Returns:
+        int or None: Peak memory in bytes, or None where it cannot be read.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def start_timings(command: str) -> Timings:
+    """
+    Start recording the stages of a command.
+
+    Args:
+        command (str): Name of the command being timed.
+
+    Returns:
+        Timings: The record that stages are added to.
+    """
+    global _active
+    _active = Timings(command)
+    return _active
+
+def stop_timings() -> Optional[Timings]:
+    """
+    Stop recording stages.
+
+    Returns:
+        Timings or None: The record, if one was being kept.
+    """
+    global _active
+    timings, _active = _active, None
+    return timings
+
+@contextmanager
+def stage(name: str) -> Iterator[Stage]:
+    """
+    Time the body of a with block as a stage of the running command.
+
+    The body sets rows on the yielded Stage to the number of rows it handled.
+    When no timings are being recorded this costs next to nothing.
+
+    Args:
+        name (str): Name of the stage.
+
+    Yields:
+        Stage: Counter for the rows handled in this run of the stage.
+    """
+    current = Stage(name)
+    timings = _active
+    if timings is None:
+        yield current
+        return
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        total = timings.stages.get(name)
+        if total is None:
+            total = timings.stages[name] = Stage(name)
+        total.seconds += time.perf_counter() - start
+        total.rows += current.rows
+        total.calls += 1
+        total.max_rss = max_rss()
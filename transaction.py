@@ -0,0 +1,62 @@
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Iterator
+
+class Transaction(Mapping):
+    """
+    A single transaction, stored in fixed slots rather than a dictionary.
+
+    A slotted record takes a fraction of the memory of a dictionary per row, and
+    labels and rule versions are interned so that rows share one string per
+    distinct value. Fields are read and written as attributes, or by key like a
+    dictionary for existing callers; only the fields below exist.
+    """
+    __slots__ = ('date', 'description', 'amount', 'label', 'rule_version')
+
+    def __init__(self, date: datetime, description: str, amount: float, label: str = 'Unclassified', rule_version: str = '') -> None:
+        """
+        Initialize a Transaction.
+
+        Args:
+            date (datetime): Date of the transaction.
+            description (str): Description given by the bank.
+            amount (float): Amount of the transaction.
+            label (str): Label the transaction is classified as. Defaults to 'Unclassified'.
+            rule_version (str): Fingerprint of the rules that set the label. Defaults to ''.
+        """
+        self.date = date
+        self.description = description
+        self.amount = amount
+        self.label = sys.intern(label)
+        self.rule_version = sys.intern(rule_version)
+
+    def __getitem__(self, key: str) -> any:
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: any) -> None:
+        if key not in _FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Transaction({self.date!r}, {self.description!r}, {self.amount!r}, {self.label!r}, {self.rule_version!r})"
+
+    def copy(self) -> 'Transaction':
+        """
+        Get a shallow copy of the transaction.
+
+        Returns:
+            Transaction: A new record with the same field values.
+        """
+        return Transaction(self.date, self.description, self.amount, self.label, self.rule_version)
+
+_FIELDS = frozenset(Transaction.__slots__)
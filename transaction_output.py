@@ -0,0 +1,134 @@
+import csv
+import io
+import json
+import sys
+from abc import abstractmethod, ABCMeta
+from itertools import islice
+from typing import Iterable, Optional, TextIO
+from transaction import Transaction
+from transactions_access import format_storage_date
+
+# Transactions formatted and written together, so a large window costs few writes
+OUTPUT_BATCH_SIZE = 10_000
+
+class ITransactionOutput(metaclass=ABCMeta):
+    def __init__(self, stream: Optional[TextIO] = None, classified: bool = False) -> None:
+        """
+        Initialize an output that writes transactions to a stream in batches.
+
+        Args:
+            stream (TextIO, optional): Stream to write to. Defaults to standard output.
+            classified (bool): Whether the transactions were just classified, which
+                formats may show differently from a listing. Defaults to False.
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.classified = classified
+
+    @property
+    def summary_stream(self) -> TextIO:
+        """
+        Get the stream that counts and other notes are printed to, kept apart from
+        the transactions by formats that are read by other programs.
+        """
+        return sys.stderr
+
+    def header(self) -> str:
+        """
+        Get the text written before the first transaction.
+        """
+        return ''
+
+    @abstractmethod
+    def format_transactions(self, transactions: list[Transaction]) -> str:
+        raise NotImplementedError
+
+    def write(self, transactions: Iterable[Transaction]) -> int:
+        """
+        Format and write transactions a batch at a time.
+
+        Args:
+            transactions (Iterable[Transaction]): Transactions to write.
+
+        Returns:
+            int: Number of transactions written.
+        """
+        transactions = iter(transactions)
+        write = self.stream.write
+        write(self.header())
+        count = 0
+        while True:
+            batch = list(islice(transactions, OUTPUT_BATCH_SIZE))
+            if not batch:
+                break
+            write(self.format_transactions(batch))
+            count += len(batch)
+        self.stream.flush()
+        return count
+
+class TableOutput(ITransactionOutput):
+    """
+    One line per transaction for reading in a terminal.
+    """
+    @property
+    def summary_stream(self) -> TextIO:
+        return self.stream
+
+    def format_transactions(self, transactions: list[Transaction]) -> str:
+        if self.classified:
+            lines = [
+                f"{format_storage_date(txn.date)} {txn.description}: {txn.amount} unable to classify\n"
+                if txn.label == 'Unclassified' else
+                f"{format_storage_date(txn.date)} {txn.description}: {txn.amount} classified as {txn.label}\n"
+                for txn in transactions
+            ]
+        else:
+            lines = [f"{format_storage_date(txn.date)} {txn.description}: {txn.amount} [{txn.label}]\n" for txn in transactions]
+        return ''.join(lines)
+
+class CsvOutput(ITransactionOutput):
+    """
+    CSV with a header row, in the columns of an imported file plus the label.
+    """
+    def header(self) -> str:
+        return 'date,description,amount,label\r\n'
+
+    def format_transactions(self, transactions: list[Transaction]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows((format_storage_date(txn.date), txn.description, txn.amount, txn.label) for txn in transactions)
+        return buffer.getvalue()
+
+class JsonlOutput(ITransactionOutput):
+    """
+    One JSON object per line, as the server lists transactions.
+    """
+    # Transactions hold no containers, so the check for reference cycles is wasted
+    _encode = json.JSONEncoder(check_circular=False).encode
+
+    def format_transactions(self, transactions: list[Transaction]) -> str:
+        encode = self._encode
+        return ''.join([
+            encode({'date': format_storage_date(txn.date), 'description': txn.description, 'amount': txn.amount, 'label': txn.label}) + '\n'
+            for txn in transactions
+        ])
+
+OUTPUT_FORMATS = {'table': TableOutput, 'csv': CsvOutput, 'jsonl': JsonlOutput}
+
+def create_output(output_format: str, stream: Optional[TextIO] = None, classified: bool = False) -> ITransactionOutput:
+    """
+    Create the output for a format name.
+
+    Args:
+        output_format (str): One of the OUTPUT_FORMATS names.
+        stream (TextIO, optional): Stream to write to. Defaults to standard output.
+        classified (bool): Whether the transactions were just classified. Defaults to False.
+
+    Returns:
+        ITransactionOutput: Output writing that format.
+
+    Raises:
+        ValueError: If the format is not known.
+    """
+    output_class = OUTPUT_FORMATS.get(output_format)
+    if output_class is None:
+        raise ValueError(f"Unknown output format {output_format}, expected one of {', '.join(OUTPUT_FORMATS)}")
+    return output_class(stream, classified)
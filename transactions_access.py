@@ -1,8 +1,22 @@
 import csv
+import hashlib
+import io
+import json
+import math
+import mmap
 import os
-from datetime import datetime, timedelta
+import sys
+from array import array
+from functools import lru_cache
+from itertools import chain, islice
+from operator import itemgetter
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from datetime import datetime
 from abc import abstractmethod, ABCMeta
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Sequence
+from timings import stage
+from transaction import Transaction
 
 class ITransactionsAccess(metaclass=ABCMeta):
     @abstractmethod
@@ -14,14 +28,1013 @@ class ITransactionsAccess(metaclass=ABCMeta):
         raise NotImplementedError
     
     @abstractmethod
-    def import_transactions(self, transactions_file: str) -> None:
+    def import_transactions(self, transactions_file: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def append_transactions(self, transactions: list[Transaction]) -> None:
         raise NotImplementedError
     
     @abstractmethod
-    def get_transactions(self, start_date: datetime, end_date: datetime, label: Optional[str]) -> list[dict[str, any]]:
+    def get_transactions(self, start_date: datetime, end_date: datetime, label: Optional[str]) -> list[Transaction]:
         raise NotImplementedError
 
-class TransactionsAccess:
+    def iter_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> Iterator[Transaction]:
+        """
+        Yield transactions within a date range and optionally filtered by label, for reading only.
+
+        Unlike get_transactions, the transactions are not handed out for relabelling
+        and the store is not changed, so several threads can read at once. Labels
+        changed on transactions from get_transactions are only seen once saved.
+        Stores should override this; the default falls back to get_transactions.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+            label (str, optional): Filter transactions by label. Defaults to None.
+
+        Yields:
+            Transaction: A transaction in date order, which must not be changed.
+        """
+        yield from self.get_transactions(start_date, end_date, label)
+
+    def close(self) -> None:
+        """
+        Release any files or connections held by the store.
+        """
+
+    def compact(self) -> None:
+        """
+        Fold changes saved to a log into the main files of the store.
+
+        Stores that save label changes to a log should override this.
+        """
+
+    def count_transactions(self) -> int:
+        """
+        Count the transactions in the store.
+
+        Stores that know their size should override this.
+
+        Returns:
+            int: Number of transactions.
+        """
+        return sum(1 for _ in self.iter_label_amounts('0001-01-01', '9999-12-31'))
+
+    def duplicate_index_file(self) -> Optional[str]:
+        """
+        Get the path of the hash index used to skip duplicates on import.
+
+        Returns:
+            str or None: Path of the index file, or None if the store does not keep one.
+        """
+        return None
+
+    def import_checkpoint_file(self, transactions_file: str) -> Optional[str]:
+        """
+        Get the path to keep the checkpoint of a chunked import of a bank export at.
+
+        Stores keep it with themselves rather than next to the export, which may
+        be in a read-only or shared directory.
+
+        Args:
+            transactions_file (str): Path to the CSV file being imported.
+
+        Returns:
+            str or None: Path of the checkpoint file, or None to keep it next to the export.
+        """
+        return None
+
+    def get_duplicate_index(self) -> Optional['DuplicateIndex']:
+        """
+        Open the hash index of the transactions in the store.
+
+        The index is rebuilt from the store if it is missing or does not cover
+        exactly the transactions in the store, for example after a crash between
+        storing a chunk and indexing it, or after convert.
+
+        Returns:
+            DuplicateIndex or None: The index, or None if the store does not keep one.
+        """
+        index_file = self.duplicate_index_file()
+        if index_file is None:
+            return None
+        duplicate_index = DuplicateIndex(index_file)
+        if len(duplicate_index) != self.count_transactions():
+            duplicate_index.rebuild(self.iter_transactions('0001-01-01', '9999-12-31'))
+        return duplicate_index
+
+    def iter_label_amounts(self, start_date: str, end_date: str) -> Iterator[tuple[str, float]]:
+        """
+        Yield the label and amount of each transaction within a date range.
+
+        Stores that can read these two fields without building Transaction
+        records should override this.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[str, float]: Label and amount of a transaction.
+        """
+        for transaction in self.get_transactions(start_date, end_date, None):
+            yield transaction['label'], transaction['amount']
+
+    def iter_label_totals(self, start_date: str, end_date: str) -> Iterator[tuple[str, float]]:
+        """
+        Yield (label, amount) pairs that sum to each label's total within a date range.
+
+        Stores that keep precomputed totals should override this to yield one pair
+        per label instead of one per transaction.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[str, float]: A label and an amount to add to its total.
+        """
+        return self.iter_label_amounts(start_date, end_date)
+
+    def iter_dated_label_totals(self, start_date: str, end_date: str) -> Iterator[tuple[datetime, str, float]]:
+        """
+        Yield (date, label, amount) triples that sum to each label's total of each day within a date range.
+
+        Stores that keep daily totals should override this to yield one triple per
+        label and day instead of one per transaction.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[datetime, str, float]: A day, a label and an amount to add to its total, in date order.
+        """
+        for transaction in self.iter_transactions(start_date, end_date):
+            yield transaction.date, transaction.label, transaction.amount
+
+    def get_label_amount_columns(self, start_date: str, end_date: str) -> tuple[Sequence[int], Sequence[int], list[str]]:
+        """
+        Get the labels and amounts of the transactions within a date range as columns.
+
+        Stores that keep these columns natively should override this.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Returns:
+            Tuple: Label code of each transaction, its amount in cents, and the label of each code.
+        """
+        label_codes, amounts, codes = array('I'), array('q'), {}
+        for label, amount in self.iter_label_amounts(start_date, end_date):
+            code = codes.get(label)
+            if code is None:
+                code = codes[label] = len(codes)
+            label_codes.append(code)
+            amounts.append(round(amount * 100))
+        return label_codes, amounts, list(codes)
+
+# Columns of the storage file, in order
+STORAGE_FIELDNAMES = ['date', 'description', 'amount', 'label', 'rule_version']
+
+# Field order of the date formats the parser has a splitter for
+DATE_FIELD_ORDERS = {
+    '%d/%m/%Y': ('/', 2, 1, 0),
+    '%Y-%m-%d': ('-', 0, 1, 2),
+}
+
+class DateParser:
+    def __init__(self, formats: Sequence[str]) -> None:
+        """
+        Initialize a DateParser that accepts dates in any of the given formats.
+
+        Dates are split on their separator and converted with int(), which is much
+        faster than datetime.strptime. The format of the first date parsed is
+        tried first from then on, and each distinct date string is only parsed
+        once, so the rows of a day share one datetime object.
+
+        Args:
+            formats (Sequence[str]): Accepted formats, in order of preference.
+                Each must be a key of DATE_FIELD_ORDERS.
+        """
+        self.formats = list(formats)
+        self._cache: dict[str, datetime] = {}
+
+    def __call__(self, text: str) -> datetime:
+        """
+        Parse a date.
+
+        Args:
+            text (str): Date in one of the accepted formats.
+
+        Returns:
+            datetime: The parsed date.
+
+        Raises:
+            ValueError: If the date is not in any of the accepted formats.
+        """
+        date = self._cache.get(text)
+        if date is None:
+            date = self._cache[text] = self._parse(text)
+        return date
+
+    def _parse(self, text: str) -> datetime:
+        for i, date_format in enumerate(self.formats):
+            separator, year, month, day = DATE_FIELD_ORDERS[date_format]
+            fields = text.split(separator)
+            # Same widths strptime allows: a four digit year, one or two digit day and month
+            if len(fields) != 3 or len(fields[year]) != 4 or not 0 < len(fields[month]) < 3 or not 0 < len(fields[day]) < 3:
+                continue
+            if not all(field.isascii() and field.isdigit() for field in fields):
+                continue
+            try:
+                date = datetime(int(fields[year]), int(fields[month]), int(fields[day]))
+            except ValueError:
+                continue
+            if i:
+                # Files use one format throughout, so try this one first next time
+                self.formats.insert(0, self.formats.pop(i))
+            return date
+        raise ValueError(f"Date {text} does not match any known formats")
+
+def parse_cents(text: str) -> int:
+    """
+    Parse an amount into a whole number of cents.
+
+    Args:
+        text (str): Amount as a decimal number.
+
+    Returns:
+        int: The amount in cents, rounded to the nearest cent.
+
+    Raises:
+        ValueError: If the text is not a finite number.
+    """
+    # float() is exact to well within half a cent for any amount below 10^13
+    cents = float(text) * 100
+    if not math.isfinite(cents):
+        raise ValueError(f"Amount {text} is not a finite number")
+    return round(cents)
+
+def read_columns(file, required: Sequence[str], optional: Sequence[str] = ()) -> Iterator[tuple[str, ...]]:
+    """
+    Read the named columns of each row of a CSV file that starts with a header.
+
+    Args:
+        file: Open CSV file, or any iterable of its lines.
+        required (Sequence[str]): Columns that must be present.
+        optional (Sequence[str]): Columns that read as '' when missing.
+
+    Yields:
+        Tuple[str, ...]: Required then optional fields of a row. Blank lines are
+        skipped, and fields missing from short rows read as ''.
+
+    Raises:
+        KeyError: If a required column is missing.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {name: i for i, name in enumerate(header)}
+    indexes = [columns[name] for name in required] + [columns.get(name, len(header)) for name in optional]
+    width = max(indexes) + 1
+    get_fields = itemgetter(*indexes)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        yield get_fields(row)
+
+def read_transactions_file(transactions_file: str) -> list[Transaction]:
+    """
+    Read and parse the transactions of a bank export file.
+
+    Columns other than date, description and amount are not kept.
+
+    Args:
+        transactions_file (str): Path to the CSV file containing transactions.
+
+    Returns:
+        List[Transaction]: Unclassified transactions in file order.
+
+    Raises:
+        ValueError: If a date is not in day/month/year format.
+    """
+    parse_date = DateParser(['%d/%m/%Y'])
+    transactions = []
+    with open(transactions_file, mode='r', newline='') as file:
+        for date, description, amount in read_columns(file, ['date', 'description', 'amount']):
+            # Imported transactions start unclassified, not labelled by any rule set yet
+            transactions.append(Transaction(parse_date(date), description, parse_cents(amount) / 100))
+    return transactions
+
+def read_transaction_chunks(transactions_file: str, chunk_size: int, offset: int = 0) -> Iterator[tuple[list[Transaction], int]]:
+    """
+    Read and parse the transactions of a bank export file a chunk at a time.
+
+    Only one chunk of parsed transactions is held at a time, whatever the size
+    of the file.
+
+    Args:
+        transactions_file (str): Path to the CSV file containing transactions.
+        chunk_size (int): Number of transactions per chunk.
+        offset (int): Position in the file to start reading rows from, as yielded
+            with an earlier chunk. Defaults to 0, the first row.
+
+    Yields:
+        Tuple[List[Transaction], int]: Unclassified transactions in file order, and
+        the position in the file just after the last of them.
+
+    Raises:
+        ValueError: If a date is not in day/month/year format.
+    """
+    parse_date = DateParser(['%d/%m/%Y'])
+    with open(transactions_file, mode='r', newline='') as file:
+        header = file.readline()
+        if offset:
+            file.seek(offset)
+        # readline rather than iterating the file, so that tell() stays usable; the
+        # csv reader only pulls the lines of the row it is reading
+        lines = chain([header], iter(file.readline, ''))
+        chunk = []
+        for date, description, amount in read_columns(lines, ['date', 'description', 'amount']):
+            chunk.append(Transaction(parse_date(date), description, parse_cents(amount) / 100))
+            if len(chunk) == chunk_size:
+                yield chunk, file.tell()
+                chunk = []
+        if chunk:
+            yield chunk, file.tell()
+
+# Number of bytes before the checkpointed position that must be unchanged to resume
+CHECKPOINT_DIGEST_BYTES = 4096
+
+class ImportCheckpoint:
+    def __init__(self, transactions_file: str, checkpoint_file: Optional[str] = None) -> None:
+        """
+        Initialize the record of how far an import of a bank export file has got.
+
+        The checkpoint holds the position in the file after the last chunk written
+        to the store, and a digest of the bytes just before it, so that rows after
+        it can be fixed before resuming but a different file is not resumed part
+        way. A chunk that was stored just before a crash, but not checkpointed, is
+        imported again on resume.
+
+        Args:
+            transactions_file (str): Path to the CSV file being imported.
+            checkpoint_file (str, optional): Path to keep the checkpoint at.
+                Defaults to the transactions file with '.checkpoint' appended.
+        """
+        self.transactions_file = transactions_file
+        self.checkpoint_file = checkpoint_file or transactions_file + '.checkpoint'
+        self.offset = 0
+        self.rows = 0
+
+    def _digest(self, offset: int) -> str:
+        """
+        Digest the last CHECKPOINT_DIGEST_BYTES bytes of the file before a position.
+        """
+        with open(self.transactions_file, mode='rb') as file:
+            start = max(offset - CHECKPOINT_DIGEST_BYTES, 0)
+            file.seek(start)
+            return hashlib.sha1(file.read(offset - start)).hexdigest()
+
+    def load(self) -> bool:
+        """
+        Read the checkpoint of an earlier import, if there is one.
+
+        Returns:
+            bool: Whether a checkpoint was found.
+
+        Raises:
+            ValueError: If the file before the checkpointed position has changed.
+        """
+        if not os.path.exists(self.checkpoint_file):
+            return False
+        with open(self.checkpoint_file) as file:
+            checkpoint = json.load(file)
+        if checkpoint['digest'] != self._digest(checkpoint['offset']):
+            raise ValueError(f"{self.transactions_file} no longer matches {self.checkpoint_file}")
+        self.offset = checkpoint['offset']
+        self.rows = checkpoint['rows']
+        return True
+
+    def save(self, offset: int, rows: int) -> None:
+        """
+        Record that the rows up to a position in the file are in the store.
+
+        Args:
+            offset (int): Position in the file after the last stored row.
+            rows (int): Number of rows stored so far.
+        """
+        self.offset = offset
+        self.rows = rows
+        temporary_file = self.checkpoint_file + '.tmp'
+        with open(temporary_file, mode='w') as file:
+            json.dump({'offset': offset, 'rows': rows, 'digest': self._digest(offset)}, file)
+        # Replacing the file means a crash never leaves a half written checkpoint
+        os.replace(temporary_file, self.checkpoint_file)
+
+    def clear(self) -> None:
+        """
+        Remove the checkpoint once the import has finished.
+        """
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+def import_checkpoint_name(transactions_file: str) -> str:
+    """
+    Name the checkpoint of an import kept with a store, after a digest of the
+    absolute path of the export so that each export has its own.
+
+    Args:
+        transactions_file (str): Path to the CSV file being imported.
+
+    Returns:
+        str: File name of the checkpoint.
+    """
+    digest = hashlib.sha1(os.path.abspath(transactions_file).encode('utf-8')).hexdigest()[:16]
+    return f"import-{digest}.checkpoint"
+
+def transaction_key(transaction: Transaction) -> int:
+    """
+    Hash the date, description and amount of a transaction.
+
+    The hash is stable across processes, unlike hash(), so it can be stored.
+
+    Args:
+        transaction (Transaction): Transaction to hash.
+
+    Returns:
+        int: A 64-bit hash.
+    """
+    content = f"{transaction.date.toordinal()}\x1f{round(transaction.amount * 100)}\x1f{transaction.description}"
+    return int.from_bytes(hashlib.blake2b(content.encode('utf-8'), digest_size=8).digest(), 'little')
+
+# Duplicate index file header: format tag with the byte order of the slots, then the number of keys
+DUPLICATE_INDEX_TAG = b'TXNKEYS' + (b'L' if sys.byteorder == 'little' else b'B')
+DUPLICATE_INDEX_HEADER = 16
+DUPLICATE_INDEX_MIN_SLOTS = 1024
+# Keys hashed and inserted together when the index is rebuilt from the store
+DUPLICATE_INDEX_BATCH = 65_536
+
+class DuplicateIndex:
+    def __init__(self, index_file: str) -> None:
+        """
+        Initialize a DuplicateIndex from its file, which may not exist yet.
+
+        The file is an open-addressed hash table of the transaction_key of every
+        stored transaction, mapped into memory and probed in place, so opening it
+        and checking a transaction do not depend on how large the store is. Each
+        slot holds a key and the number of keys added before it, so that an import
+        can tell the transactions stored before it started from its own.
+
+        Args:
+            index_file (str): Path to the index file.
+        """
+        self.index_file = index_file
+        self.size = 0
+        self._file = None
+        self._mmap = None
+        self._slots = memoryview(array('Q'))
+        self._mask = 0
+        if os.path.exists(index_file):
+            self._open()
+        # Number of keys when the index was opened, which filter_new checks against
+        self.start_size = self.size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _open(self) -> None:
+        """
+        Map the index file, or start an empty index if it is not a duplicate index.
+        """
+        self._file = open(self.index_file, mode='r+b')
+        header = self._file.read(DUPLICATE_INDEX_HEADER)
+        slots = (os.fstat(self._file.fileno()).st_size - DUPLICATE_INDEX_HEADER) // 16
+        # A file of another format, or from a machine of the other byte order, is started again
+        if header[:8] != DUPLICATE_INDEX_TAG or slots < DUPLICATE_INDEX_MIN_SLOTS or slots & (slots - 1):
+            self.close()
+            self._create(DUPLICATE_INDEX_MIN_SLOTS)
+            return
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._slots = memoryview(self._mmap)[DUPLICATE_INDEX_HEADER:].cast('Q')
+        self._mask = slots - 1
+        self.size = int.from_bytes(header[8:], 'little')
+
+    def close(self) -> None:
+        """
+        Unmap the index file.
+        """
+        self._slots.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = self._mmap = None
+        self._slots = memoryview(array('Q'))
+
+    def _create(self, slots: int, keys: Iterable[tuple[int, int]] = ()) -> None:
+        """
+        Write a new index file with a number of slots and the given keys, and map it.
+
+        The file is written next to the index and moved over it, so a crash leaves
+        either the old index or the new one.
+
+        Args:
+            slots (int): Number of slots, a power of two.
+            keys (Iterable[Tuple[int, int]]): Key and number of keys added before it.
+        """
+        temporary_file = self.index_file + '.tmp'
+        with open(temporary_file, mode='w+b') as file:
+            file.truncate(DUPLICATE_INDEX_HEADER + slots * 16)
+            with mmap.mmap(file.fileno(), 0) as table:
+                with memoryview(table) as view:
+                    with view[DUPLICATE_INDEX_HEADER:].cast('Q') as table_slots:
+                        size = 0
+                        for key, sequence in keys:
+                            self._insert(table_slots, slots - 1, key, sequence)
+                            size += 1
+                table[:DUPLICATE_INDEX_HEADER] = DUPLICATE_INDEX_TAG + size.to_bytes(8, 'little')
+        self.close()
+        os.replace(temporary_file, self.index_file)
+        self._open()
+
+    @staticmethod
+    def _insert(slots: memoryview, mask: int, key: int, sequence: int) -> None:
+        """
+        Put a key in the first free slot from its home slot on.
+        """
+        i = key & mask
+        while slots[2 * i]:
+            i = (i + 1) & mask
+        slots[2 * i] = key
+        slots[2 * i + 1] = sequence
+
+    def count(self, key: int, before: Optional[int] = None) -> int:
+        """
+        Count the stored transactions with a key.
+
+        Args:
+            key (int): A key from slot_key.
+            before (int, optional): Only count transactions among the first this
+                many added. Defaults to None, which counts them all.
+
+        Returns:
+            int: Number of transactions with the key.
+        """
+        if before is None:
+            before = self.size
+        slots = self._slots
+        mask = self._mask
+        count = 0
+        if not slots:
+            return count
+        i = key & mask
+        while True:
+            stored = slots[2 * i]
+            if not stored:
+                return count
+            if stored == key and slots[2 * i + 1] < before:
+                count += 1
+            i = (i + 1) & mask
+
+    def filter_new(self, transactions: list[Transaction], unmatched: dict[int, int]) -> list[Transaction]:
+        """
+        Drop the transactions that are already in the store.
+
+        Identical transactions within a file, such as two coffees on the same day,
+        are told apart by how often they occur: the n-th occurrence of a key in the
+        file is a duplicate if the store held at least n transactions with that key
+        when the index was opened.
+
+        Args:
+            transactions (list): Parsed transactions, in file order.
+            unmatched (dict): For each key met so far that the store held when the
+                index was opened, how many of those transactions no row of the file
+                has matched yet. Updated in place so it can be carried from chunk to
+                chunk. Keys the store did not hold are always new and are left out,
+                so it only grows with the overlap of the file and the store.
+
+        Returns:
+            List[Transaction]: The transactions not in the store yet.
+        """
+        new_transactions = []
+        start_size = self.start_size
+        for transaction in transactions:
+            key = slot_key(transaction)
+            remaining = unmatched.get(key)
+            if remaining is None:
+                remaining = self.count(key, start_size)
+            if remaining:
+                unmatched[key] = remaining - 1
+            else:
+                new_transactions.append(transaction)
+        return new_transactions
+
+    def count_occurrences(self, transactions: list[Transaction], unmatched: dict[int, int]) -> None:
+        """
+        Count the rows read from a file without checking them, as filter_new would.
+
+        Args:
+            transactions (list): Parsed transactions, in file order.
+            unmatched (dict): Stored transactions each key has not matched yet.
+        """
+        self.filter_new(transactions, unmatched)
+
+    def add(self, transactions: Iterable[Transaction]) -> None:
+        """
+        Add transactions that have been written to the store to the index.
+
+        The table is doubled once it is half full. The number of keys in the
+        header is written last, so a crash part way leaves an index shorter
+        than the store, which get_duplicate_index rebuilds.
+
+        Args:
+            transactions (Iterable[Transaction]): Transactions just added to the store.
+        """
+        keys = [slot_key(transaction) for transaction in transactions]
+        if not keys:
+            return
+        needed = self.size + len(keys)
+        if 2 * needed > len(self._slots) // 2:
+            slots = DUPLICATE_INDEX_MIN_SLOTS
+            while 2 * needed > slots:
+                slots *= 2
+            self._create(slots, self._entries())
+        table_slots = self._slots
+        mask = self._mask
+        insert = self._insert
+        for sequence, key in enumerate(keys, self.size):
+            insert(table_slots, mask, key, sequence)
+        self.size = needed
+        self._mmap[8:DUPLICATE_INDEX_HEADER] = needed.to_bytes(8, 'little')
+
+    def _entries(self) -> Iterator[tuple[int, int]]:
+        """
+        Yield the key and sequence number of each key counted in the header.
+        """
+        slots = self._slots
+        for i in range(0, len(slots), 2):
+            # Slots written after the header was last updated are left behind
+            if slots[i] and slots[i + 1] < self.size:
+                yield slots[i], slots[i + 1]
+
+    def rebuild(self, transactions: Iterable[Transaction]) -> None:
+        """
+        Replace the index with one over the given transactions.
+
+        Args:
+            transactions (Iterable[Transaction]): Every transaction in the store.
+        """
+        self.size = 0
+        self._create(DUPLICATE_INDEX_MIN_SLOTS)
+        transactions = iter(transactions)
+        while True:
+            batch = list(islice(transactions, DUPLICATE_INDEX_BATCH))
+            if not batch:
+                break
+            self.add(batch)
+        self.start_size = self.size
+
+def slot_key(transaction: Transaction) -> int:
+    """
+    Get the transaction_key of a transaction as stored in a DuplicateIndex slot,
+    where zero marks an empty slot.
+    """
+    return transaction_key(transaction) or 1
+
+def label_log_file(storage_file: str) -> str:
+    """
+    Get the path of the log of label changes saved since a storage file was last written in full.
+    """
+    return storage_file + '.labels'
+
+def read_label_log(log_file: str) -> list[tuple[int, str, str]]:
+    """
+    Read the label changes saved to a label log.
+
+    Args:
+        log_file (str): Path to the label log.
+
+    Returns:
+        List[Tuple[int, str, str]]: Position of the row in the storage file, its new
+        label and rule version, in the order saved. Empty if there is no log.
+    """
+    if not os.path.exists(log_file):
+        return []
+    with open(log_file, mode='r', newline='') as file:
+        text = file.read()
+    # A crash can leave a partly written entry at the end
+    text = text[:text.rfind('\n') + 1]
+    return [(int(position), label, rule_version) for position, label, rule_version in csv.reader(io.StringIO(text))]
+
+def read_storage_file(storage_file: str) -> Iterator[Transaction]:
+    """
+    Read and parse the transactions of a storage file one at a time.
+
+    Label changes saved to the label log since the file was last written in
+    full are applied, the latest change of a row winning.
+
+    Args:
+        storage_file (str): Path to the storage file.
+
+    Yields:
+        Transaction: A stored transaction.
+    """
+    changes = {position: (label, rule_version) for position, label, rule_version in read_label_log(label_log_file(storage_file))}
+    # Stores are written as year-month-day, but older ones may hold day/month/year dates
+    parse_date = DateParser(['%Y-%m-%d', '%d/%m/%Y'])
+    with open(storage_file, mode='r', newline='') as file:
+        # Stores written before rule versions were tracked lack the column
+        rows = read_columns(file, ['date', 'description', 'amount'], ['label', 'rule_version'])
+        if not changes:
+            for date, description, amount, label, rule_version in rows:
+                yield Transaction(parse_date(date), description, parse_cents(amount) / 100, label, rule_version)
+            return
+        for position, (date, description, amount, label, rule_version) in enumerate(rows):
+            change = changes.get(position)
+            if change is not None:
+                label, rule_version = change
+            yield Transaction(parse_date(date), description, parse_cents(amount) / 100, label, rule_version)
+
+def storage_row(transaction: Transaction) -> tuple:
+    """
+    Format a transaction as a row of the storage file.
+
+    Args:
+        transaction (Transaction): Transaction to format.
+
+    Returns:
+        Tuple: Values of the STORAGE_FIELDNAMES columns.
+    """
+    return format_storage_date(transaction.date), transaction.description, transaction.amount, transaction.label, transaction.rule_version
+
+@lru_cache(maxsize=4096)
+def format_storage_date(date: datetime) -> str:
+    """
+    Format a date as year-month-day, remembering recent days since strftime is slow.
+    """
+    return date.strftime('%Y-%m-%d')
+
+def date_window(start_date: str, end_date: str) -> tuple[datetime, datetime]:
+    """
+    Convert an inclusive range of dates into datetime bounds.
+
+    Args:
+        start_date (str): Start date, as year-month-day.
+        end_date (str): End date, as year-month-day.
+
+    Returns:
+        Tuple[datetime, datetime]: Inclusive start and exclusive end, the end covering the entire end day.
+    """
+    start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    end_date = datetime.strptime(end_date, '%Y-%m-%d')
+
+    # Adjust end_date to include the entire day
+    end_date = end_date.replace(hour=23, minute=59, second=59)
+    return start_date, end_date
+
+# Batches larger than this are applied to a DateIndex by rebuilding its lists in one
+# pass, as each single insert or delete moves every later entry of the lists
+INDEX_BATCH_REBUILD = 64
+
+class DateIndex:
+    def __init__(self) -> None:
+        """
+        Initialize an empty index of transaction positions ordered by date.
+
+        Dates and positions are kept in two parallel lists so that a date range
+        can be located with bisect. Transactions sharing a date keep their
+        insertion order.
+        """
+        self.dates: list[datetime] = []
+        self.positions: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, date: datetime, position: int) -> None:
+        """
+        Add a transaction position to the index.
+
+        Args:
+            date (datetime): Date of the transaction.
+            position (int): Position of the transaction in the store.
+        """
+        if not self.dates or date >= self.dates[-1]:
+            # Imports are usually chronological, so appending is the common case
+            self.dates.append(date)
+            self.positions.append(position)
+        else:
+            i = bisect_right(self.dates, date)
+            self.dates.insert(i, date)
+            self.positions.insert(i, position)
+
+    def remove(self, date: datetime, position: int) -> None:
+        """
+        Remove a transaction position from the index.
+
+        Args:
+            date (datetime): Date the transaction was indexed under.
+            position (int): Position of the transaction in the store.
+        """
+        lo = bisect_left(self.dates, date)
+        hi = bisect_right(self.dates, date, lo)
+        i = self.positions.index(position, lo, hi)
+        del self.dates[i]
+        del self.positions[i]
+
+    def add_many(self, entries: list[tuple[datetime, int]]) -> None:
+        """
+        Add several transaction positions to the index.
+
+        Entries dated on or after the end of the index are appended; a large batch
+        of earlier ones is sorted and merged into the part of the index from its
+        first date on, in a single pass.
+
+        Args:
+            entries (list): Date and position of each transaction, in the order that
+                transactions sharing a date should keep.
+        """
+        if not entries:
+            return
+        if len(entries) <= INDEX_BATCH_REBUILD:
+            for date, position in entries:
+                self.add(date, position)
+            return
+        entries = sorted(entries, key=itemgetter(0))
+        if not self.dates or entries[0][0] >= self.dates[-1]:
+            self.dates.extend(map(itemgetter(0), entries))
+            self.positions.extend(map(itemgetter(1), entries))
+            return
+        lo = bisect_left(self.dates, entries[0][0])
+        # merge is stable, so existing entries stay ahead of new ones sharing their date
+        merged = list(merge(zip(self.dates[lo:], self.positions[lo:]), entries, key=itemgetter(0)))
+        self.dates[lo:] = map(itemgetter(0), merged)
+        self.positions[lo:] = map(itemgetter(1), merged)
+
+    def remove_many(self, entries: list[tuple[datetime, int]]) -> None:
+        """
+        Remove several transaction positions from the index.
+
+        A large batch is removed by filtering the part of the index between its
+        first and last date once, instead of one deletion at a time.
+
+        Args:
+            entries (list): Date the transaction was indexed under and its position.
+        """
+        if len(entries) <= INDEX_BATCH_REBUILD:
+            for date, position in entries:
+                self.remove(date, position)
+            return
+        removed = {position for _, position in entries}
+        lo = bisect_left(self.dates, min(entries, key=itemgetter(0))[0])
+        hi = bisect_right(self.dates, max(entries, key=itemgetter(0))[0], lo)
+        kept = [i for i in range(lo, hi) if self.positions[i] not in removed]
+        self.dates[lo:hi] = [self.dates[i] for i in kept]
+        self.positions[lo:hi] = [self.positions[i] for i in kept]
+
+    def bounds(self, start_date: datetime, end_date: datetime) -> tuple[int, int]:
+        """
+        Locate the slice of the index dated within [start_date, end_date).
+
+        Args:
+            start_date (datetime): Inclusive lower bound.
+            end_date (datetime): Exclusive upper bound.
+
+        Returns:
+            Tuple[int, int]: Start and end of the slice of positions.
+        """
+        lo = bisect_left(self.dates, start_date)
+        return lo, bisect_left(self.dates, end_date, lo)
+
+    def range(self, start_date: datetime, end_date: datetime) -> list[int]:
+        """
+        Get the positions of transactions dated within [start_date, end_date).
+
+        Args:
+            start_date (datetime): Inclusive lower bound.
+            end_date (datetime): Exclusive upper bound.
+
+        Returns:
+            List[int]: Positions in date order.
+        """
+        lo, hi = self.bounds(start_date, end_date)
+        return self.positions[lo:hi]
+
+class DailyRollup:
+    def __init__(self) -> None:
+        """
+        Initialize an empty table of daily totals per label.
+
+        For each label the table holds the total in cents and the number of
+        transactions of every day. Cumulative sums over the days are built on
+        demand, so the total of any date range costs two bisections per label.
+        """
+        self.days: dict[str, dict[datetime, list[int]]] = {}
+        # Per label: sorted days, and cumulative cents and counts with a leading zero
+        self._prefix: dict[str, tuple[list[datetime], list[int], list[int]]] = {}
+
+    def add(self, label: str, date: datetime, cents: int, count: int = 1) -> None:
+        """
+        Add an amount to the total of a label on a day.
+
+        Args:
+            label (str): Label of the transaction.
+            date (datetime): Date of the transaction.
+            cents (int): Amount in cents, negative to take a transaction out.
+            count (int): Change in the number of transactions. Defaults to 1.
+        """
+        label_days = self.days.get(label)
+        if label_days is None:
+            label_days = self.days[label] = {}
+        entry = label_days.get(date)
+        if entry is None:
+            entry = label_days[date] = [0, 0]
+        entry[0] += cents
+        entry[1] += count
+        if not entry[1]:
+            del label_days[date]
+
+        prefix = self._prefix.get(label)
+        if prefix is None:
+            return
+        dates, cumulative_cents, cumulative_counts = prefix
+        if entry[1] and dates and date == dates[-1]:
+            cumulative_cents[-1] += cents
+            cumulative_counts[-1] += count
+        elif entry[1] and (not dates or date > dates[-1]):
+            # Chronological imports extend the cumulative sums in place
+            dates.append(date)
+            cumulative_cents.append(cumulative_cents[-1] + cents)
+            cumulative_counts.append(cumulative_counts[-1] + count)
+        else:
+            del self._prefix[label]
+
+    def _get_prefix(self, label: str) -> tuple[list[datetime], list[int], list[int]]:
+        """
+        Get the cumulative sums of a label, rebuilding them if a past day has changed.
+        """
+        prefix = self._prefix.get(label)
+        if prefix is None:
+            dates = sorted(self.days[label])
+            cumulative_cents, cumulative_counts = [0], [0]
+            for date in dates:
+                cents, count = self.days[label][date]
+                cumulative_cents.append(cumulative_cents[-1] + cents)
+                cumulative_counts.append(cumulative_counts[-1] + count)
+            prefix = self._prefix[label] = (dates, cumulative_cents, cumulative_counts)
+        return prefix
+
+    def label_totals(self, start_date: datetime, end_date: datetime) -> list[tuple[str, int]]:
+        """
+        Get the total of every label with transactions dated within [start_date, end_date).
+
+        Args:
+            start_date (datetime): Inclusive lower bound.
+            end_date (datetime): Exclusive upper bound.
+
+        Returns:
+            List[Tuple[str, int]]: Label and total in cents, ordered by the first day
+            each label has a transaction in the range.
+        """
+        totals = []
+        for label in self.days:
+            dates, cumulative_cents, cumulative_counts = self._get_prefix(label)
+            lo = bisect_left(dates, start_date)
+            hi = bisect_left(dates, end_date, lo)
+            if cumulative_counts[hi] - cumulative_counts[lo]:
+                totals.append((dates[lo], label, cumulative_cents[hi] - cumulative_cents[lo]))
+        totals.sort(key=lambda total: total[0])
+        return [(label, cents) for _, label, cents in totals]
+
+    def daily_totals(self, start_date: datetime, end_date: datetime) -> list[tuple[datetime, str, int]]:
+        """
+        Get the total of every label on every day within [start_date, end_date).
+
+        Args:
+            start_date (datetime): Inclusive lower bound.
+            end_date (datetime): Exclusive upper bound.
+
+        Returns:
+            List[Tuple[datetime, str, int]]: Day, label and total in cents, in date order.
+        """
+        totals = []
+        for label in self.days:
+            dates, cumulative_cents, _ = self._get_prefix(label)
+            lo = bisect_left(dates, start_date)
+            hi = bisect_left(dates, end_date, lo)
+            for i in range(lo, hi):
+                totals.append((dates[i], label, cumulative_cents[i + 1] - cumulative_cents[i]))
+        totals.sort(key=itemgetter(0))
+        return totals
+
+class TransactionsAccess(ITransactionsAccess):
     def __init__(self, storage_file: str = 'transactions_storage.csv') -> None:
         """
         Initialize TransactionsAccess with a storage file.
@@ -31,61 +1044,195 @@ class TransactionsAccess:
         """
         self.storage_file = storage_file
         self.transactions = []
+        self.date_index = DateIndex()
+        self.label_index: dict[str, DateIndex] = {}
+        self.rollup = DailyRollup()
+        # Label and rule version of the transactions handed out by get_transactions, by
+        # position, so that relabelling done by the caller can be folded into label_index
+        self._checked_out: dict[int, tuple[str, str]] = {}
+        # Positions whose label or rule version changed since the last save
+        self._dirty: set[int] = set()
+        # Number of entries in the label log, which the storage file does not reflect yet
+        self._label_log_entries = 0
         if os.path.exists(self.storage_file):
             self.load_transactions()
 
+    def _index_transactions(self, first_position: int) -> None:
+        """
+        Add the transactions from a given position to the end of the store to the date and label indexes.
+
+        Args:
+            first_position (int): Position of the first transaction to index.
+        """
+        transactions = self.transactions
+        entries = [(transactions[position].date, position) for position in range(first_position, len(transactions))]
+        self.date_index.add_many(entries)
+        label_entries: dict[str, list[tuple[datetime, int]]] = {}
+        for date, position in entries:
+            transaction = transactions[position]
+            label_entries.setdefault(transaction.label, []).append((date, position))
+            self.rollup.add(transaction.label, date, round(transaction.amount * 100))
+        for label, entries in label_entries.items():
+            label_index = self.label_index.get(label)
+            if label_index is None:
+                label_index = self.label_index[label] = DateIndex()
+            label_index.add_many(entries)
+
+    def _sync_labels(self) -> None:
+        """
+        Move checked out transactions whose label has changed to their new label index,
+        and mark the changed ones to be saved.
+        """
+        # Take the checkouts first, so readers of the server that sync at the same time
+        # never iterate over a dictionary another one is clearing
+        checked_out, self._checked_out = self._checked_out, {}
+        # Moves are grouped by label, so that a large relabelling rebuilds each index once
+        removed: dict[str, list[tuple[datetime, int]]] = {}
+        added: dict[str, list[tuple[datetime, int]]] = {}
+        for position, (old_label, old_rule_version) in checked_out.items():
+            transaction = self.transactions[position]
+            new_label = transaction.label
+            if new_label != old_label or transaction.rule_version != old_rule_version:
+                self._dirty.add(position)
+            if new_label != old_label:
+                removed.setdefault(old_label, []).append((transaction.date, position))
+                added.setdefault(new_label, []).append((transaction.date, position))
+                cents = round(transaction.amount * 100)
+                self.rollup.add(old_label, transaction.date, -cents, -1)
+                self.rollup.add(new_label, transaction.date, cents)
+        for label, entries in removed.items():
+            self.label_index[label].remove_many(entries)
+        for label, entries in added.items():
+            label_index = self.label_index.get(label)
+            if label_index is None:
+                label_index = self.label_index[label] = DateIndex()
+            label_index.add_many(entries)
+
     def load_transactions(self) -> None:
         """
         Load transactions from the storage file.
         """
-        with open(self.storage_file, mode='r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    # First, try the expected day/month/year format
-                    row['date'] = datetime.strptime(row['date'], '%d/%m/%Y')
-                except ValueError:
-                    # If the first format fails, try the year-month-day format
-                    row['date'] = datetime.strptime(row['date'], '%Y-%m-%d')
-                row['amount'] = float(row['amount'])
-                self.transactions.append(row)
+        with stage('load: parse') as timed:
+            self.transactions.extend(read_storage_file(self.storage_file))
+            self._label_log_entries = len(read_label_log(label_log_file(self.storage_file)))
+            timed.rows = len(self.transactions)
+        with stage('load: index') as timed:
+            self._index_transactions(0)
+            timed.rows = len(self.transactions)
 
     def save_transactions(self) -> None:
         """
-        Save transactions to the storage file.
+        Save the label changes of the transactions handed out by get_transactions.
+
+        Only the rows whose label or rule version changed are written, appended to
+        the label log next to the storage file, so the cost depends on the number
+        of changes rather than the size of the store. Once the log would hold as
+        many entries as the store has rows, the store is compacted instead.
         """
-        with open(self.storage_file, mode='w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=['date', 'description', 'amount', 'label'])
-            writer.writeheader()
-            for transaction in self.transactions:
-                # Create a copy of the transaction dict for CSV writing
-                transaction_copy = transaction.copy()
-                # Convert datetime to string in the copy only
-                transaction_copy['date'] = transaction_copy['date'].strftime('%Y-%m-%d')
-                writer.writerow(transaction_copy)
+        self._sync_labels()
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        if self._label_log_entries + len(dirty) >= len(self.transactions):
+            self.compact()
+            return
+        transactions = self.transactions
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows((position, transactions[position].label, transactions[position].rule_version) for position in sorted(dirty))
+        log_file = label_log_file(self.storage_file)
+        if os.path.exists(log_file) and os.path.getsize(log_file):
+            with open(log_file, mode='rb+') as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    # Drop an entry cut short by a crash, which would run into the new ones
+                    file.seek(0)
+                    file.truncate(file.read().rfind(b'\n') + 1)
+        with open(log_file, mode='a', newline='') as file:
+            file.write(buffer.getvalue())
+        self._label_log_entries += len(dirty)
 
-    def import_transactions(self, transactions_file: str) -> None:
+    def compact(self) -> None:
+        """
+        Rewrite the storage file with the current labels and remove the label log.
+
+        The new file replaces the old one only once complete, and the log is removed
+        after that, so an interrupted compaction leaves a store that loads the same.
+        """
+        self._sync_labels()
+        self._dirty.clear()
+        temporary_file = self.storage_file + '.tmp'
+        with open(temporary_file, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(STORAGE_FIELDNAMES)
+            writer.writerows(storage_row(transaction) for transaction in self.transactions)
+        os.replace(temporary_file, self.storage_file)
+        log_file = label_log_file(self.storage_file)
+        if os.path.exists(log_file):
+            os.remove(log_file)
+        self._label_log_entries = 0
+
+    def _storage_header(self) -> Optional[list[str]]:
+        """
+        Read the header of the storage file, if it can safely be appended to.
+
+        Returns:
+            List[str] or None: Column names of the storage file, or None if the file
+            is missing, empty or does not end with a complete row.
+        """
+        if not os.path.exists(self.storage_file) or os.path.getsize(self.storage_file) == 0:
+            return None
+        with open(self.storage_file, mode='rb') as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b'\n':
+                return None
+        with open(self.storage_file, mode='r', newline='') as file:
+            return next(csv.reader(file), None)
+
+    def append_transactions(self, transactions: list[Transaction]) -> None:
+        """
+        Add new transactions to the store and append only those rows to the storage file.
+
+        The new rows are formatted into one buffer and written with a single call.
+        If the storage file does not have the current columns, it is rewritten in full.
+
+        Args:
+            transactions (list): Parsed transactions to add.
+        """
+        first_position = len(self.transactions)
+        self.transactions.extend(transactions)
+        self._index_transactions(first_position)
+        if self._storage_header() != STORAGE_FIELDNAMES:
+            self.compact()
+            return
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(storage_row(transaction) for transaction in transactions)
+        with open(self.storage_file, mode='a', newline='') as file:
+            file.write(buffer.getvalue())
+
+    def count_transactions(self) -> int:
+        return len(self.transactions)
+
+    def duplicate_index_file(self) -> Optional[str]:
+        return self.storage_file + '.hashes'
+
+    def import_checkpoint_file(self, transactions_file: str) -> Optional[str]:
+        return f"{self.storage_file}.{import_checkpoint_name(transactions_file)}"
+
+    def import_transactions(self, transactions_file: str) -> int:
         """
         Import transactions from a CSV file and save them to storage.
         
         Args:
             transactions_file (str): Path to the CSV file containing transactions.
+
+        Returns:
+            int: Number of transactions imported.
         """
-        with open(transactions_file, mode='r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Handle multiple date formats, prioritize day/month/year as per your data
-                try:
-                    row['date'] = datetime.strptime(row['date'], '%d/%m/%Y')
-                except ValueError:
-                    raise ValueError(f"Date {row['date']} does not match any known formats")
-                
-                row['amount'] = float(row['amount'])
-                row['label'] = 'Unclassified'  # Initial label for all imported transactions
-                self.transactions.append(row)
-        self.save_transactions()
-
-    def get_transactions(self, start_date: datetime, end_date: datetime, label: Optional[str] = None) -> list[dict[str, any]]:
+        new_transactions = read_transactions_file(transactions_file)
+        self.append_transactions(new_transactions)
+        return len(new_transactions)
+
+    def get_transactions(self, start_date: datetime, end_date: datetime, label: Optional[str] = None) -> list[Transaction]:
         """
         Get transactions within a specified date range and optionally filtered by label.
 
@@ -95,18 +1242,189 @@ class TransactionsAccess:
             label (str, optional): Filter transactions by label. Defaults to None.
 
         Returns:
-            List[Dict[str, Any]]: List of filtered transactions.
-        """
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
-        end_date = datetime.strptime(end_date, '%Y-%m-%d')
+            List[Transaction]: List of filtered transactions, in date order.
 
-        # Adjust end_date to include the entire day
-        end_date = end_date + timedelta(days=1) - timedelta(seconds=1)
+        The range is located by bisecting the date index (or the label's own date
+        index when a label is given), so the cost is O(log N + k) for k matches.
+        """
+        start_date, end_date = date_window(start_date, end_date)
 
         # Filter transactions
+        self._sync_labels()
         if label:
-            filtered_transactions = [txn for txn in self.transactions if start_date <= txn['date'] < end_date and txn['label'] == label]
+            index = self.label_index.get(label)
+            if index is None:
+                return []
         else:
-            filtered_transactions = [txn for txn in self.transactions if start_date <= txn['date'] < end_date]
+            index = self.date_index
+        positions = index.range(start_date, end_date)
+        filtered_transactions = [self.transactions[position] for position in positions]
 
+        # Remember the labels handed out so later relabelling can be re-indexed and saved
+        self._checked_out.update(zip(positions, [(txn.label, txn.rule_version) for txn in filtered_transactions]))
         return filtered_transactions
+
+    def iter_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> Iterator[Transaction]:
+        index = self.label_index.get(label) if label else self.date_index
+        if index is None:
+            return
+        transactions = self.transactions
+        for position in index.range(*date_window(start_date, end_date)):
+            yield transactions[position]
+
+    def iter_label_amounts(self, start_date: str, end_date: str) -> Iterator[tuple[str, float]]:
+        """
+        Yield the label and amount of each transaction within a date range.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[str, float]: Label and amount of a transaction, in date order.
+        """
+        lo, hi = self.date_index.bounds(*date_window(start_date, end_date))
+        transactions, positions = self.transactions, self.date_index.positions
+        for i in range(lo, hi):
+            transaction = transactions[positions[i]]
+            yield transaction.label, transaction.amount
+
+    def iter_label_totals(self, start_date: str, end_date: str) -> Iterator[tuple[str, float]]:
+        """
+        Yield the total of each label within a date range, from the daily rollup.
+
+        The cost depends on the number of labels, not on the number of transactions
+        or days in the range.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[str, float]: A label and its total.
+        """
+        self._sync_labels()
+        for label, cents in self.rollup.label_totals(*date_window(start_date, end_date)):
+            yield label, cents / 100
+
+    def iter_dated_label_totals(self, start_date: str, end_date: str) -> Iterator[tuple[datetime, str, float]]:
+        """
+        Yield the total of each label on each day within a date range, from the daily rollup.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[datetime, str, float]: A day, a label and its total that day, in date order.
+        """
+        self._sync_labels()
+        for date, label, cents in self.rollup.daily_totals(*date_window(start_date, end_date)):
+            yield date, label, cents / 100
+
+class StreamingTransactionsAccess(ITransactionsAccess):
+    """
+    Read-only view of a CSV store. Importing or appending raises PermissionError.
+    """
+    def __init__(self, storage_file: str = 'transactions_storage.csv') -> None:
+        """
+        Initialize a read-only view of a storage file that never holds the whole store.
+
+        Every query reads the storage file from disk one row at a time, so reports
+        can be run over stores larger than the available memory.
+
+        Args:
+            storage_file (str): Path to the storage file. Defaults to 'transactions_storage.csv'.
+        """
+        self.storage_file = storage_file
+
+    def load_transactions(self) -> None:
+        """
+        Nothing is loaded up front; queries stream the storage file.
+        """
+
+    def save_transactions(self) -> None:
+        """
+        Nothing is held in memory, so there is nothing to save.
+        """
+
+    def import_transactions(self, transactions_file: str) -> int:
+        """
+        Refuse to import, as the view is read-only.
+
+        Raises:
+            PermissionError: Always.
+        """
+        raise PermissionError(f"{self.storage_file} is opened read-only for streaming")
+
+    def append_transactions(self, transactions: list[Transaction]) -> None:
+        """
+        Refuse to append, as the view is read-only.
+
+        Raises:
+            PermissionError: Always.
+        """
+        raise PermissionError(f"{self.storage_file} is opened read-only for streaming")
+
+    def get_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> list[Transaction]:
+        """
+        Get transactions within a specified date range and optionally filtered by label.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+            label (str, optional): Filter transactions by label. Defaults to None.
+
+        Returns:
+            List[Transaction]: List of filtered transactions, in storage order.
+        """
+        return list(self.iter_transactions(start_date, end_date, label))
+
+    def iter_transactions(self, start_date: str, end_date: str, label: Optional[str] = None) -> Iterator[Transaction]:
+        """
+        Yield transactions within a date range and optionally filtered by label.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+            label (str, optional): Filter transactions by label. Defaults to None.
+
+        Yields:
+            Transaction: A transaction, in storage order.
+        """
+        start_date, end_date = date_window(start_date, end_date)
+        for transaction in read_storage_file(self.storage_file):
+            if start_date <= transaction.date < end_date and (not label or transaction.label == label):
+                yield transaction
+
+    def iter_label_amounts(self, start_date: str, end_date: str) -> Iterator[tuple[str, float]]:
+        """
+        Yield the label and amount of each transaction within a date range.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[str, float]: Label and amount of a transaction, in storage order.
+        """
+        start_date, end_date = date_window(start_date, end_date)
+        for transaction in read_storage_file(self.storage_file):
+            if start_date <= transaction.date < end_date:
+                yield transaction.label, transaction.amount
+
+    def iter_dated_label_totals(self, start_date: str, end_date: str) -> Iterator[tuple[datetime, str, float]]:
+        """
+        Yield the date, label and amount of each transaction within a date range.
+
+        Args:
+            start_date (str): Start date.
+            end_date (str): End date, inclusive.
+
+        Yields:
+            Tuple[datetime, str, float]: Date, label and amount of a transaction, in storage order.
+        """
+        start_date, end_date = date_window(start_date, end_date)
+        for transaction in read_storage_file(self.storage_file):
+            if start_date <= transaction.date < end_date:
+                yield transaction.date, transaction.label, transaction.amount
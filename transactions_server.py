@@ -0,0 +1,207 @@
+import json
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Iterator, Optional
+from urllib.parse import parse_qs, urlsplit
+from report_access import PERIOD_GROUPINGS
+from reporting_manager import ReportingManager
+
+DATE_FORMAT = '%Y-%m-%d'
+
+class ReadWriteLock:
+    def __init__(self) -> None:
+        """
+        Initialize a lock that any number of readers or a single writer can hold.
+
+        A waiting writer keeps new readers out, so a steady stream of reads cannot
+        starve a classification.
+        """
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Hold the lock for reading for the duration of a with block.
+        """
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Hold the lock for writing for the duration of a with block.
+        """
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+class RequestError(Exception):
+    """A request that cannot be answered, with the HTTP status to answer it with."""
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+class TransactionsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers list and report requests (GET) and classify requests (POST) with JSON.
+
+    Parameters are passed in the query string: start_date, and optionally
+    end_date (defaults to today), label for list, group_by (day, week, month
+    or year) for report, and incremental for classify.
+    """
+    server_version = 'FinancialReport/1.0'
+
+    def do_GET(self) -> None:
+        self._handle({'/list': self._list, '/report': self._report})
+
+    def do_POST(self) -> None:
+        self._handle({'/classify': self._classify})
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'local'
+
+    def _handle(self, routes: dict) -> None:
+        url = urlsplit(self.path)
+        try:
+            route = routes.get(url.path)
+            if route is None:
+                raise RequestError(404, f"No such request: {self.command} {url.path}")
+            parameters = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            status, body = 200, route(parameters)
+        except RequestError as error:
+            status, body = error.status, {'error': str(error)}
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    @staticmethod
+    def _date_range(parameters: dict[str, str]) -> tuple[str, str]:
+        """
+        Get the start and end date of a request, checking they are year-month-day dates.
+        """
+        if 'start_date' not in parameters:
+            raise RequestError(400, "Missing parameter start_date")
+        dates = (parameters['start_date'], parameters.get('end_date', datetime.now().strftime(DATE_FORMAT)))
+        for date in dates:
+            try:
+                datetime.strptime(date, DATE_FORMAT)
+            except ValueError:
+                raise RequestError(400, f"Date {date} is not in year-month-day format")
+        return dates
+
+    def _list(self, parameters: dict[str, str]) -> dict:
+        start_date, end_date = self._date_range(parameters)
+        with self.server.lock.read():
+            transactions = [
+                {'date': txn.date.strftime(DATE_FORMAT), 'description': txn.description, 'amount': txn.amount, 'label': txn.label}
+                for txn in self.server.reporting_manager.transactions_access.iter_transactions(start_date, end_date, parameters.get('label'))
+            ]
+        return {'transactions': transactions}
+
+    def _report(self, parameters: dict[str, str]) -> dict:
+        start_date, end_date = self._date_range(parameters)
+        group_by = parameters.get('group_by')
+        if group_by is not None and group_by not in PERIOD_GROUPINGS:
+            raise RequestError(400, f"group_by must be one of {', '.join(PERIOD_GROUPINGS)}")
+        with self.server.lock.read():
+            if group_by:
+                return self.server.reporting_manager.summarise_by(start_date, end_date, group_by)
+            return self.server.reporting_manager.summarise(start_date, end_date)
+
+    def _classify(self, parameters: dict[str, str]) -> dict:
+        start_date, end_date = self._date_range(parameters)
+        if self.server.reporting_manager.classification_engine is None:
+            raise RequestError(409, "The server was started without --rules")
+        incremental = parameters.get('incremental', '').lower() in ('1', 'true', 'yes')
+        with self.server.lock.write():
+            transactions = self.server.reporting_manager.classify(start_date, end_date, incremental)
+        unclassified = sum(1 for txn in transactions if txn.label == 'Unclassified')
+        return {'processed': len(transactions), 'classified': len(transactions) - unclassified, 'unclassified': unclassified}
+
+class TransactionsHTTPServer(ThreadingHTTPServer):
+    def __init__(self, address: tuple[str, int], reporting_manager: ReportingManager) -> None:
+        """
+        Initialize a server answering requests on a TCP address, one thread per connection.
+
+        Args:
+            address (tuple): Host and port to listen on.
+            reporting_manager (ReportingManager): Store, rules and report engine to answer with.
+        """
+        self.reporting_manager = reporting_manager
+        self.lock = ReadWriteLock()
+        super().__init__(address, TransactionsRequestHandler)
+
+class TransactionsUnixServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, reporting_manager: ReportingManager) -> None:
+        """
+        Initialize a server answering requests on a Unix socket, one thread per connection.
+
+        Args:
+            socket_path (str): Path to create the socket at.
+            reporting_manager (ReportingManager): Store, rules and report engine to answer with.
+        """
+        self.reporting_manager = reporting_manager
+        self.lock = ReadWriteLock()
+        super().__init__(socket_path, TransactionsRequestHandler)
+
+def serve(reporting_manager: ReportingManager, host: str = '127.0.0.1', port: int = 8765, socket_path: Optional[str] = None) -> None:
+    """
+    Answer requests until interrupted or terminated, then close the store.
+
+    Args:
+        reporting_manager (ReportingManager): Store, rules and report engine to answer with.
+        host (str): Host to listen on. Defaults to '127.0.0.1'.
+        port (int): Port to listen on. Defaults to 8765.
+        socket_path (str, optional): Listen on a Unix socket at this path instead of TCP.
+    """
+    if socket_path:
+        server = TransactionsUnixServer(socket_path, reporting_manager)
+        print(f"Serving on {socket_path}")
+    else:
+        server = TransactionsHTTPServer((host, port), reporting_manager)
+        print(f"Serving on http://{host}:{server.server_address[1]}")
+    if threading.current_thread() is threading.main_thread():
+        # Stop the same way on a termination signal as on Ctrl+C
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path:
+            os.remove(socket_path)
+        with server.lock.write():
+            reporting_manager.transactions_access.close()